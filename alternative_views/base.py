@@ -1,22 +1,28 @@
 
-import copy
-
 from functools import update_wrapper
 
+from django.core.cache import get_cache
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.decorators import classonlymethod
 from django.utils.datastructures import SortedDict
 from django import http
 
 from alternative_views.mixins import Mixin
+from alternative_views.cache import (cached_response, get_model_versions,
+    get_response_key)
+from alternative_views.conditional import (combine_validators, not_modified,
+    not_modified_response, set_validators)
+from alternative_views.instrumentation import Recorder
+from alternative_views.lazy import LazyContext
+from alternative_views.signals import view_instrumented
+from alternative_views.parallel import run_concurrently
+from alternative_views.plan import compile_plan, get_waves, watch_plan
+from alternative_views.mixins.object.joins import fetch_lookup_chain
 
 from django.utils.log import getLogger
 logger = getLogger('django.request')
 
 
-# Monkey patch SortedDict to work with copy
-SortedDict.__copy__ = SortedDict.copy
-
-
 def get_declared_mixins(bases, attrs):
     """
     Create a list of mixin instances from the passed in 'attrs', plus any
@@ -36,12 +42,39 @@ def get_declared_mixins(bases, attrs):
     return SortedDict(mixins)
 
 
+def get_dependencies(name, mixins):
+    """
+    Returns the names of the mixins the given mixins depend on, for
+    each of them. Required names missing from the view are ignored.
+    """
+    dependencies = SortedDict()
+    previous = []
+    for mixin_name, mixin in mixins.iteritems():
+        if mixin.requires is None:
+            dependencies[mixin_name] = tuple(previous)
+        else:
+            for required in mixin.requires:
+                if required in mixins and not required in previous:
+                    raise ImproperlyConfigured(u"%s.%s requires %s which "
+                        u"isn't declared before it." % (
+                        name, mixin_name, required))
+            dependencies[mixin_name] = tuple(required
+                for required in mixin.requires if required in mixins)
+        previous.append(mixin_name)
+    return dependencies
+
+
 class ViewMetaclass(type):
     """
     A meta class the will gather the view's mixins
     """
     def __new__(cls, name, bases, attrs):
         attrs['base_mixins'] = get_declared_mixins(bases, attrs)
+        attrs['mixin_dependencies'] = get_dependencies(name,
+            attrs['base_mixins'])
+        # Compiled DispatchPlan per (mode, join_parent_lookups), each class
+        # gets its own
+        attrs['dispatch_plans'] = {}
         new_class = super(ViewMetaclass, cls).__new__(cls, name, bases, attrs)
         return new_class
 
@@ -63,22 +96,72 @@ class View(object):
 
     default_security = 'allow'
 
+    # Fetch chained detail objects (project -> bug) with a single query,
+    # for the lookups the mixins declare in join_lookups
+    join_parent_lookups = True
+
+    # Record the time and queries of each mixin and send view_instrumented
+    instrument = False
+    # Add the recorded timings as a Server-Timing header (needs instrument)
+    server_timing = False
+
+    # Build the context of the mixins that don't depend on each other in
+    # a pool of that many threads, each one with its own database
+    # connections. Not used while instrumenting.
+    parallel_workers = None
+
+    # Cache the responses to GET and HEAD requests for that many seconds.
+    # Saving or deleting one of the mixins' model instances evicts them.
+    cache_timeout = None
+    # Cached responses skip the mixins' authorization: only share them
+    # between users when the view doesn't depend on who is asking. Changes
+    # to the models' many to many relations (memberships) evict them, other
+    # models the authorizations depend on don't.
+    cache_vary_on_user = True
+    # GET parameters the response depends on
+    cache_query_parameters = ('page', 'after', 'before')
+    cache_alias = 'default'
+    # Expired responses are served that many more seconds while one
+    # request builds the new one
+    cache_stale_timeout = 0
+    # Longest time a request waits for another one to build the response
+    cache_lock_timeout = 10
+
     def __init__(self, *args, **kwargs):
         self.contributed = {}
         self.mode = kwargs.get('mode', None)
+        # Other keywords are the view's options, checked by as_view
+        for key, value in kwargs.iteritems():
+            if key != 'mode' and hasattr(self.__class__, key):
+                setattr(self, key, value)
         self.context = {}
-        # Setup the mixins
-        self.mixins = copy.deepcopy(self.base_mixins)
-        for i, (name, mixin) in enumerate(reversed(self.mixins.items())):
-            # Updated the mixins variables to match what the view has
-            # TODO: don't push names like this !
-            mixin.context_object_name = name
-            mixin.args = copy.deepcopy(args)
-            mixin.kwargs = copy.deepcopy(kwargs)
-            # Mode order: mixin's, default's (if not first), view's
-            default_mode = mixin.default_mode if i != 0 else None
-            mode = mixin.mode or default_mode or self.mode
-            mixin.as_mode(mode)
+        self.recorder = None
+        self.handler = None
+        # True once a mixin granted the request
+        self.authorized = False
+        self.plan = self.get_plan(self.mode, self.join_parent_lookups)
+        # Setup the mixins from the plan's prototypes
+        self.mixins = SortedDict()
+        for spec in self.plan.mixins:
+            mixin = spec.mixin.clone()
+            mixin.args = args
+            mixin.kwargs = dict(kwargs)
+            mixin.view = self
+            self.mixins[spec.name] = mixin
+
+    @classmethod
+    def get_plan(cls, mode, join_parent_lookups=None):
+        """
+        Returns the DispatchPlan for the given mode, compiling it on first use.
+        """
+        if join_parent_lookups is None:
+            join_parent_lookups = cls.join_parent_lookups
+        key = (mode, join_parent_lookups)
+        try:
+            return cls.dispatch_plans[key]
+        except KeyError:
+            plan = compile_plan(cls, mode, join_parent_lookups)
+            return cls.dispatch_plans.setdefault(key, plan)
 
     @classonlymethod
     def as_view(cls, **initkwargs):
@@ -95,6 +178,18 @@ class View(object):
                 raise TypeError(u"%s() received an invalid keyword %r" % (
                     cls.__name__, key))
 
+        try:
+            plan = cls.get_plan(initkwargs.get('mode', None),
+                initkwargs.get('join_parent_lookups', None))
+        except NotImplementedError:
+            # Unknown modes are reported when the view is called
+            pass
+        else:
+            # The plan watches the class' cache settings
+            watch_plan(plan,
+                initkwargs.get('cache_timeout', cls.cache_timeout),
+                initkwargs.get('cache_alias', cls.cache_alias))
+
         def view(request, *args, **kwargs):
             self = cls(**initkwargs)
             return self.dispatch(request, *args, **kwargs)
@@ -113,39 +208,236 @@ class View(object):
         Search order is reversed as we expect latest mixins to be more
         specialized than the firsts.
         """
-        for name, mixin in reversed(list(self.mixins.iteritems())):
-            if mixin.can_process(request):
-                return getattr(mixin, 'process')
-        return self.http_method_not_allowed
+        method = request.method.lower()
+        if not method in self.http_method_names:
+            return self.http_method_not_allowed
+        if self.plan.dynamic:
+            for name, mixin in reversed(self.mixins.items()):
+                if mixin.can_process(request):
+                    return mixin.process
+            return self.http_method_not_allowed
+        name = self.plan.get_handler_name(method)
+        if name is None:
+            return self.http_method_not_allowed
+        return self.mixins[name].process
 
     def dispatch(self, request, *args, **kwargs):
+        if self.cache_timeout and request.method in ('GET', 'HEAD'):
+            return self.get_cached_response(request, *args, **kwargs)
+        return self.respond(request, *args, **kwargs)
+
+    def get_cache_key_parts(self, request, cache, *args, **kwargs):
+        """
+        Returns what the cached response depends on.
+        """
+        parts = [
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.mode,
+            args,
+            sorted(kwargs.items()),
+            [(name, request.GET.getlist(name))
+                for name in self.cache_query_parameters],
+            get_model_versions(cache, self.plan.models),
+        ]
+        if self.cache_vary_on_user:
+            # AnonymousUser has no pk
+            parts.append(getattr(getattr(request, 'user', None), 'pk', None))
+        return parts
+
+    def get_cached_response(self, request, *args, **kwargs):
+        cache = get_cache(self.cache_alias)
+        key = get_response_key(
+            self.get_cache_key_parts(request, cache, *args, **kwargs))
+        return cached_response(cache, key, self.cache_timeout,
+            lambda: self.respond(request, *args, **kwargs),
+            stale_timeout=self.cache_stale_timeout,
+            lock_timeout=self.cache_lock_timeout, request=request)
+
+    def respond(self, request, *args, **kwargs):
+        if not self.instrument:
+            return self.process_request(request, *args, **kwargs)
+        self.recorder = Recorder()
+        self.recorder.start()
+        handler_name = None
+        try:
+            response = self.process_request(request, *args, **kwargs)
+            handler_name = self.get_handler_name(self.handler)
+            # Templates may still run queries
+            if hasattr(response, 'render') and callable(response.render) \
+                    and not response.is_rendered:
+                self.recorder.call(handler_name, 'render', response.render)
+        finally:
+            self.recorder.stop()
+        view_instrumented.send(sender=self.__class__, view=self,
+            request=request, response=response,
+            timings=self.recorder.timings, handler=handler_name)
+        if self.server_timing:
+            response['Server-Timing'] = self.recorder.server_timing()
+        return response
+
+    def process_request(self, request, *args, **kwargs):
         # Try to dispatch to the right method; if a method doesn't exist,
         # defer to the error handler. Also defer to the error handler if the
         # request method isn't on the approved list.
-        permissions = {}
+        recorder = self.recorder
+        handler = self.handler = self.find_http_method(request)
+        self.request = request
+        self.args = args
+        self.kwargs = kwargs
+        # Answer without building any context when possible
+        if request.method.lower() == 'options' and \
+                'options' in self.http_method_names:
+            return self.options(request, *args, **kwargs)
+        if handler == self.http_method_not_allowed:
+            return handler(request, self.context, *args, **kwargs)
+
         for mixin in self.mixins.values():
-            # Push the view's args/kwargs to the mixin as well as the context
+            # Push the view's args/kwargs to the mixin
             mixin.args += args
             mixin.kwargs.update(kwargs)
-            [setattr(mixin, key, value) for key, value in self.context.iteritems()]
-            self.context = mixin.get_context(
-                request, self.context, permissions=permissions, **kwargs)
-            if not any(permissions.values()) and \
-                not self.default_security == 'allow':
-                from django.core.exceptions import PermissionDenied
-                raise PermissionDenied()
-
-        if request.method.lower() in self.http_method_names:
-            handler = self.find_http_method(request)
+        if self.plan.lookup_chain:
+            fetch_lookup_chain(self.plan.lookup_chain, self.mixins, request)
+        if self.plan.lazy:
+            self.context = LazyContext(self.context)
+
+        handler_name = self.get_handler_name(handler)
+        handler_mixin = self.mixins[handler_name]
+        specs = self.plan.mixins
+        required = handler_mixin.get_required_mixins(request, specs)
+        permissions = {}
+        if required is not None:
+            # Build the context the handler needs first, then the rest only
+            # if the handler needs it
+            first = set(required)
+            first.add(handler_name)
+            first.update(spec.name for spec in specs if spec.authorization)
+            self.build_context([spec for spec in specs if spec.name in first],
+                request, permissions, kwargs, handler_name)
+            specs = [spec for spec in specs if not spec.name in first]
+            if not handler_mixin.needs_full_context(request, self.context):
+                specs = []
+        self.build_context(specs, request, permissions, kwargs, handler_name)
+
+        validators = None
+        if request.method in ('GET', 'HEAD'):
+            validators = self.get_validators(request)
+            if validators and not_modified(request, *validators):
+                return not_modified_response(*validators)
+
+        if recorder is None:
+            response = handler(request, self.context, *args, **kwargs)
         else:
-            handler = self.http_method_not_allowed
-        self.request = request
-        self.args = args
-        self.kwargs = kwargs
-        return handler(request, self.context, *args, **kwargs)
+            response = recorder.call(handler_name, 'process', handler,
+                request, self.context, *args, **kwargs)
+        if validators and response.status_code == 200:
+            set_validators(response, *validators)
+        return response
+
+    def get_validators(self, request):
+        """
+        Returns the page's ETag and last modification timestamp, or None if
+        a mixin has no validator.
+        """
+        validators = []
+        for mixin in self.mixins.itervalues():
+            validator = mixin.get_validator(request, self.context)
+            if validator is None:
+                return None
+            validators.append(validator)
+        return combine_validators(request, validators)
+
+    def build_context(self, specs, request, permissions, kwargs,
+            handler_name):
+        """
+        Updates the view's context with the given mixins' one.
+        """
+        if self.parallel_workers and self.recorder is None:
+            waves = get_waves(specs, self.mixin_dependencies)
+        else:
+            waves = [[spec] for spec in specs]
+        for wave in waves:
+            if len(wave) == 1:
+                self.context = self.build_mixin_context(wave[0], request,
+                    permissions, kwargs, handler_name)
+            else:
+                contexts = run_concurrently(self.parallel_workers,
+                    lambda spec: self.build_mixin_context(spec, request,
+                        permissions, kwargs, handler_name, evaluate=True),
+                    wave)
+                for context in contexts:
+                    if context is not self.context:
+                        self.context.update(context)
+            for spec in wave:
+                if not self.authorized:
+                    self.authorized = bool(permissions.get(spec.name))
+                if not self.authorized and \
+                    not self.default_security == 'allow':
+                    from django.core.exceptions import PermissionDenied
+                    raise PermissionDenied()
+
+    def build_mixin_context(self, spec, request, permissions, kwargs,
+            handler_name, evaluate=False):
+        """
+        Returns the context updated with the mixin's one. With evaluate, the
+        queries left for the rendering are run too.
+        """
+        name, mixin = spec.name, self.mixins[spec.name]
+        if spec.lazy_names and name != handler_name:
+            self.context.add_promise(spec.lazy_names, self.get_evaluation(
+                name, mixin, request, permissions, kwargs))
+            return self.context
+        if self.recorder is None:
+            return self.get_mixin_context(mixin, request, permissions, kwargs,
+                evaluate)
+        # The queries left for the rendering belong to the mixin too
+        return self.recorder.call(name, 'context', self.get_mixin_context,
+            mixin, request, permissions, kwargs, True)
+
+    def get_mixin_context(self, mixin, request, permissions, kwargs,
+            evaluate=False):
+        context = mixin.get_context(
+            request, self.context, permissions=permissions, **kwargs)
+        if evaluate:
+            mixin.evaluate_context(context)
+        return context
+
+    def get_evaluation(self, name, mixin, request, permissions, kwargs):
+        """
+        Returns a function building the context of a lazy mixin.
+        """
+        def evaluate():
+            recorder = self.recorder
+            if recorder is None or not recorder.recording:
+                mixin.get_context(request, self.context,
+                    permissions=permissions, **kwargs)
+            else:
+                recorder.call(name, 'lazy', self.get_mixin_context, mixin,
+                    request, permissions, kwargs, True)
+        return evaluate
+
+    def get_handler_name(self, handler):
+        """
+        Returns the name of the mixin the handler belongs to, if any.
+        """
+        handler_mixin = getattr(handler, 'im_self', None)
+        for name, mixin in self.mixins.iteritems():
+            if mixin is handler_mixin:
+                return name
+        return None
+
+    def options(self, request, *args, **kwargs):
+        """
+        Handles responding to requests for the OPTIONS HTTP verb.
+        """
+        response = http.HttpResponse()
+        response['Allow'] = ', '.join(
+            [m.upper() for m in self.plan.allowed_methods])
+        response['Content-Length'] = '0'
+        return response
 
     def http_method_not_allowed(self, request, context, *args, **kwargs):
-        allowed_methods = [m for m in self.http_method_names if hasattr(self, m)]
+        allowed_methods = list(self.plan.allowed_methods)
         logger.warning(
             'Method Not Allowed (%s): %s' % (request.method, request.path),
             extra={
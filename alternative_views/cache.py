@@ -0,0 +1,291 @@
+"""
+Response and object caches of the views.
+
+Cached responses are keyed on the versions of the models the view's
+mixins use. Saving or deleting an instance of one of those models, or
+changing its many to many relations, bumps its version, which evicts every
+cached response built from it.
+
+Cached objects are keyed on their model and primary key and are evicted
+when they are saved or deleted. Each entry holds the object as fetched by
+every queryset shape (only, defer, select_related, annotations...) as they
+load different fields. Other lookups, like slugs, map to the primary key.
+"""
+
+import time
+
+from hashlib import md5
+
+from django import http
+from django.core.cache import get_cache
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.utils.encoding import smart_str, smart_unicode
+
+
+KEY_PREFIX = 'alternative_views'
+
+# Lifetime of the model versions, longer than any response's. Django
+# caches have no "never expire" timeout.
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+# Models whose changes are tracked
+WATCHED_MODELS = set()
+# Models whose cached objects are evicted on changes
+WATCHED_OBJECTS = set()
+
+
+def get_model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
+
+
+def get_version_key(model):
+    return '%s:version:%s' % (KEY_PREFIX, get_model_label(model))
+
+
+def new_version():
+    """
+    Returns a version that differs from the previous ones, even if their
+    key was evicted from the cache.
+    """
+    return int(time.time() * 1000000)
+
+
+def get_model_versions(cache, models):
+    """
+    Returns the current version of the models.
+    """
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if not key in versions:
+            version = new_version()
+            cache.add(key, version, VERSION_TIMEOUT)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(cache, model):
+    cache.set(get_version_key(model), new_version(), VERSION_TIMEOUT)
+
+
+def get_through_models(model):
+    """
+    Returns the intermediary models of model's many to many relations, in
+    both directions.
+    """
+    fields = list(model._meta.many_to_many) + [related.field
+        for related in model._meta.get_all_related_many_to_many_objects()]
+    through_models = []
+    for field in fields:
+        through = field.rel.through
+        if not isinstance(through, basestring) and \
+                not through in through_models:
+            through_models.append(through)
+    return through_models
+
+
+def get_relation_receiver(model, alias):
+    """
+    Returns a receiver bumping model's version when its many to many
+    relations change.
+    """
+    def receiver(sender, **kwargs):
+        if kwargs.get('action', 'post').startswith('post'):
+            bump_model_version(get_cache(alias), model)
+    return receiver
+
+
+def watch_models(models, alias):
+    """
+    Bumps the models version on their post_save and post_delete signals,
+    and on their many to many relations changes, like a membership the
+    authorizations depend on.
+    """
+    for model in models:
+        if (model, alias) in WATCHED_MODELS:
+            continue
+        WATCHED_MODELS.add((model, alias))
+
+        def receiver(sender, **kwargs):
+            bump_model_version(get_cache(alias), sender)
+        uid = '%s:%s:%s' % (KEY_PREFIX, get_model_label(model), alias)
+        post_save.connect(receiver, sender=model, weak=False,
+            dispatch_uid=uid)
+        post_delete.connect(receiver, sender=model, weak=False,
+            dispatch_uid=uid)
+
+        through_receiver = get_relation_receiver(model, alias)
+        for through in get_through_models(model):
+            through_uid = '%s:%s' % (uid, get_model_label(through))
+            for signal in (m2m_changed, post_save, post_delete):
+                signal.connect(through_receiver, sender=through, weak=False,
+                    dispatch_uid=through_uid)
+
+
+def get_object_key(model, pk):
+    return '%s:object:%s:%s' % (KEY_PREFIX, get_model_label(model),
+        md5(smart_str(pk)).hexdigest())
+
+
+def get_queryset_shape(queryset):
+    """
+    Returns a hash of what the queryset loads, regardless of its filters.
+    """
+    query = queryset.query.clone()
+    query.where = query.where_class()
+    query.clear_ordering(True)
+    return md5(smart_str(query)).hexdigest()
+
+
+def get_lookup_key(model, lookup):
+    return '%s:lookup:%s:%s' % (KEY_PREFIX, get_model_label(model),
+        md5(smart_str(repr(sorted(lookup.items())))).hexdigest())
+
+
+def watch_objects(model, alias):
+    """
+    Evicts the cached instances of model on their post_save and post_delete
+    signals.
+    """
+    if (model, alias) in WATCHED_OBJECTS:
+        return
+    WATCHED_OBJECTS.add((model, alias))
+
+    def receiver(sender, instance, **kwargs):
+        get_cache(alias).delete(get_object_key(sender, instance.pk))
+    uid = '%s:objects:%s:%s' % (KEY_PREFIX, get_model_label(model), alias)
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+
+
+def is_watching_objects(model, alias):
+    return (model, alias) in WATCHED_OBJECTS
+
+
+def invalidate(model, pks=()):
+    """
+    Evicts the cached responses and objects of model, for changes made
+    without sending the post_save or post_delete signals (bulk_create,
+    update or delete on a queryset).
+    """
+    for watched, alias in list(WATCHED_MODELS):
+        if watched is model:
+            bump_model_version(get_cache(alias), model)
+    for watched, alias in list(WATCHED_OBJECTS):
+        if watched is model and pks:
+            get_cache(alias).delete_many(
+                [get_object_key(model, pk) for pk in pks])
+
+
+def get_cached_object(cache, model, lookup, shape):
+    """
+    Returns the cached object of the queryset shape matching the lookup or
+    None.
+    """
+    if lookup.keys() == ['pk']:
+        pk = lookup['pk']
+    else:
+        pk = cache.get(get_lookup_key(model, lookup))
+        if pk is None:
+            return None
+    expires, obj = cache.get(get_object_key(model, pk), {}).get(shape,
+        (0, None))
+    if obj is None or expires < time.time():
+        return None
+    # The object may have changed since the lookup was cached
+    for name, value in lookup.iteritems():
+        if name == 'pk':
+            continue
+        if smart_unicode(getattr(obj, name, None)) != smart_unicode(value):
+            return None
+    return obj
+
+
+def cache_object(cache, model, obj, lookup, timeout, shape):
+    key = get_object_key(model, obj.pk)
+    entry = cache.get(key, {})
+    entry[shape] = (time.time() + timeout, obj)
+    cache.set(key, entry, timeout)
+    if lookup.keys() != ['pk']:
+        cache.set(get_lookup_key(model, lookup), obj.pk, timeout)
+
+
+def get_response_key(parts):
+    return '%s:response:%s' % (KEY_PREFIX,
+        md5(smart_str(repr(parts))).hexdigest())
+
+
+def is_streaming(response):
+    """
+    Returns True if the response content is an iterator.
+    """
+    return getattr(response, 'streaming', False) or \
+        getattr(response, '_base_content_is_iter', False)
+
+
+def is_cacheable(response, request=None):
+    """
+    Returns True if the response can be served to other requests.
+    """
+    if response.status_code != 200 or is_streaming(response):
+        return False
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    # Cookies aren't cached, like the CSRF one a {% csrf_token %} requires
+    if response.cookies:
+        return False
+    return request is None or not request.META.get('CSRF_COOKIE_USED')
+
+
+def freeze_response(response, timeout):
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return (time.time() + timeout, response.status_code, response.content,
+        response.items())
+
+
+def thaw_response(entry):
+    expires, status_code, content, headers = entry
+    response = http.HttpResponse(content, status=status_code)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def cached_response(cache, key, timeout, build, stale_timeout=0,
+        lock_timeout=10, wait=0.05, request=None):
+    """
+    Returns the response cached under key, or calls build to get it and
+    caches it for timeout seconds.
+
+    Only one concurrent caller builds a missing or expired response. The
+    others get the expired one, kept stale_timeout more seconds, or wait up
+    to lock_timeout seconds for the new one.
+
+    The responses setting cookies aren't cached.
+    """
+    lock_key = '%s:lock' % key
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.time():
+        return thaw_response(entry)
+
+    deadline = time.time() + lock_timeout
+    while not cache.add(lock_key, 1, lock_timeout):
+        if entry is not None:
+            return thaw_response(entry)
+        if time.time() > deadline:
+            # Looks like the lock holder died, build it ourselves
+            break
+        time.sleep(wait)
+        entry = cache.get(key)
+        if entry is not None and entry[0] > time.time():
+            return thaw_response(entry)
+
+    try:
+        response = build()
+        if is_cacheable(response, request):
+            cache.set(key, freeze_response(response, timeout),
+                timeout + stale_timeout)
+        return response
+    finally:
+        cache.delete(lock_key)
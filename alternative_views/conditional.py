@@ -0,0 +1,56 @@
+"""
+Conditional GET support: the mixins' validators are combined into an
+ETag and a Last-Modified date for the whole page.
+"""
+
+import calendar
+import datetime
+
+from hashlib import md5
+
+from django import http
+from django.utils.http import (http_date, parse_http_date_safe, parse_etags,
+    quote_etag)
+
+
+def combine_validators(request, validators):
+    """
+    Returns the ETag and the last modification timestamp of the page for
+    the (etag, last_modified) validators of its mixins.
+    """
+    etag = md5(request.get_full_path())
+    last_modified = None
+    for part, modified in validators:
+        etag.update('\0%s' % (part,))
+        if isinstance(modified, datetime.datetime):
+            timestamp = calendar.timegm(modified.utctimetuple())
+            last_modified = max(last_modified, timestamp)
+    return etag.hexdigest(), last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Returns True if the client's copy of the page is still valid.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since and last_modified is not None:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        return if_modified_since is not None and \
+            last_modified <= if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified):
+    if not response.has_header('ETag'):
+        response['ETag'] = quote_etag(etag)
+    if last_modified is not None and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    return set_validators(http.HttpResponseNotModified(), etag, last_modified)
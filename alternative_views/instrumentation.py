@@ -0,0 +1,75 @@
+"""
+Per mixin timing and database queries of the views' request processing.
+"""
+
+import time
+
+from collections import namedtuple
+
+from django.db import connections
+
+
+MixinTiming = namedtuple('MixinTiming',
+    'name phase duration queries query_duration')
+
+
+class Recorder(object):
+    """
+    Records the time spent and the queries run by each mixin.
+    Durations are in seconds.
+    """
+
+    def __init__(self):
+        self.timings = []
+        self.debug_cursors = None
+
+    def start(self):
+        # Django only keeps track of the queries with a debug cursor
+        self.debug_cursors = []
+        for connection in connections.all():
+            self.debug_cursors.append(
+                (connection, connection.use_debug_cursor))
+            connection.use_debug_cursor = True
+
+    def stop(self):
+        for connection, use_debug_cursor in self.debug_cursors or ():
+            connection.use_debug_cursor = use_debug_cursor
+        self.debug_cursors = None
+
+    @property
+    def recording(self):
+        return self.debug_cursors is not None
+
+    def get_queries(self):
+        queries = []
+        for connection, use_debug_cursor in self.debug_cursors:
+            queries.append(len(connection.queries))
+        return queries
+
+    def call(self, name, phase, func, *args, **kwargs):
+        """
+        Calls func and records its timing under name and phase.
+        """
+        queries = self.get_queries()
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.time() - start
+            count, query_duration = 0, 0.0
+            for i, (connection, use_debug_cursor) in \
+                    enumerate(self.debug_cursors):
+                new_queries = connection.queries[queries[i]:]
+                count += len(new_queries)
+                query_duration += sum(float(query['time'])
+                    for query in new_queries)
+            self.timings.append(MixinTiming(
+                name, phase, duration, count, query_duration))
+
+    def server_timing(self):
+        """
+        Returns the timings formatted for a Server-Timing header.
+        """
+        return ', '.join('%s.%s;dur=%.3f' % (
+            timing.name, timing.phase, timing.duration * 1000)
+            for timing in self.timings)
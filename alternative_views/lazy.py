@@ -0,0 +1,60 @@
+"""
+Lazy context: the context entries of lazy mixins are promises evaluated
+when they are first read.
+"""
+
+
+class LazyValue(object):
+    """
+    Placeholder for the context entries of a mixin whose get_context hasn't
+    been called yet.
+    """
+
+    def __init__(self, evaluate):
+        self.evaluate = evaluate
+        self.evaluated = False
+
+    def resolve(self):
+        if not self.evaluated:
+            self.evaluated = True
+            self.evaluate()
+
+
+class LazyContext(dict):
+    """
+    Context dictionary resolving the promises it holds when they are read.
+    """
+
+    def add_promise(self, names, evaluate):
+        """
+        Sets a single promise for the names. evaluate is expected to update
+        this context with the real values.
+        """
+        promise = LazyValue(evaluate)
+        for name in names:
+            dict.__setitem__(self, name, promise)
+        return promise
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, LazyValue):
+            value.resolve()
+            value = dict.__getitem__(self, key)
+            if isinstance(value, LazyValue):
+                # The mixin didn't provide that name after all
+                dict.__delitem__(self, key)
+                raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def resolve(self):
+        """
+        Evaluates all the pending promises.
+        """
+        for key in self.keys():
+            self.get(key)
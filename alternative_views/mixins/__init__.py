@@ -1,7 +1,41 @@
 
+import copy
+
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist
+from django.template.loader import select_template
 from django.template.response import TemplateResponse
+from django.test.signals import setting_changed
+
+
+# Templates resolved by the mixins, keyed on get_template_cache_key()
+TEMPLATES = {}
+# get_template_names implementations only depending on the mixin's
+# configuration. Templates of mixins overriding it aren't cached.
+STATIC_TEMPLATE_NAMES = set()
+
+
+def clear_templates(**kwargs):
+    """
+    Empties the resolved templates cache.
+    """
+    TEMPLATES.clear()
+
+
+def templates_reload():
+    """
+    Returns True if the templates have to be resolved on every request.
+    """
+    return settings.DEBUG or settings.TEMPLATE_DEBUG
+
+
+def template_setting_changed(setting, **kwargs):
+    if setting.startswith('TEMPLATE') or setting in ('DEBUG', 'INSTALLED_APPS'):
+        clear_templates()
+
+setting_changed.connect(template_setting_changed)
 
 
 class BaseMixin(object):
@@ -24,17 +58,64 @@ class Mixin(BaseMixin):
     context_object_name = None
     template_name = None
     response_class = TemplateResponse
+    # Only evaluate the context when one of its names is read. Mixins with
+    # an authorization are always evaluated.
+    lazy = False
+    # Names of the view's mixins this one reads the context of. None means
+    # all the previous ones.
+    requires = None
 
     http_method_names = ['get', 'post', 'put', 'delete', 'head', 'options', 'trace']
 
+    # Names of the attributes holding mutable values that may be altered
+    # while processing a request. Each clone gets its own copy of them.
+    request_state = ()
+
     def __init__(self, *args, **kwargs):
         mode = kwargs.pop('mode', None)
         self.default_mode = kwargs.pop('default_mode', None)
+        lazy = kwargs.pop('lazy', None)
         super(Mixin, self).__init__(*args, **kwargs)
+        if lazy is not None:
+            self.lazy = lazy
         # Don't override mode if it was defined at the class level
         if not self.mode:
             self.mode = mode
 
+    def __getattr__(self, name):
+        """
+        Falls back to the context of the view processing the request, so
+        mixins can read the values of the mixins they require - the
+        previous ones by default - as self.<name>.
+        """
+        view = self.__dict__.get('view')
+        if view is None or name.startswith('__'):
+            raise AttributeError(name)
+        required = self.requires
+        if required is None:
+            required = view.mixin_dependencies.get(
+                self.__dict__.get('context_object_name'), ())
+        if not name in required:
+            raise AttributeError(name)
+        try:
+            return view.context[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def clone(self):
+        """
+        Returns a new instance sharing this one's configuration.
+        Only the attributes listed in request_state are copied, everything
+        else is shared with this instance.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        for name in self.request_state:
+            value = getattr(self, name, None)
+            if value is not None:
+                setattr(clone, name, copy.copy(value))
+        return clone
+
     def as_mode(self, mode):
         """
         Allows to specialize this instance according to the mode.
@@ -48,6 +129,14 @@ class Mixin(BaseMixin):
         """
         return None
 
+    def has_authorization(self):
+        """
+        Returns True if the mixin may refuse a request, in which case its
+        context is built before the others'.
+        """
+        authorization = getattr(type(self).authorization, 'im_func', None)
+        return authorization is not Mixin.authorization.im_func
+
     def get_context(self, request, context, permissions=None, **kwargs):
         """
         Returns an updated context for the given request processing.
@@ -62,11 +151,58 @@ class Mixin(BaseMixin):
             return context
         raise PermissionDenied()
 
+    def evaluate_context(self, context):
+        """
+        Runs the queries the mixin's context left for the rendering, when
+        the view builds it in a worker thread or records its queries.
+        """
+        pass
+
+    def get_validator(self, request, context):
+        """
+        Returns an (etag, last modified datetime) tuple identifying the
+        version of this mixin's context, for conditional requests. Either
+        may be None. Returns None if the mixin can't tell, in which case
+        the view doesn't answer conditional requests.
+        """
+        return None
+
+    def get_required_mixins(self, request, specs):
+        """
+        Called on the mixin handling the request. Returns the names of the
+        mixins (from the view's plan specs) whose context it needs to decide
+        how to answer, or None if it needs them all.
+        """
+        return None
+
+    def needs_full_context(self, request, context):
+        """
+        Called on the mixin handling the request once the required mixins
+        built their context. Returns False if it can process the request
+        without the other mixins' context, for example to redirect.
+        """
+        return True
+
+    def get_context_names(self):
+        """
+        Returns the names get_context adds to the context, or None if they
+        can't be known before it is called. Required for lazy mixins.
+        """
+        return None
+
+    def can_process_method(self, method):
+        """
+        Return True if that mixin can handle the given (lower case) method.
+        """
+        return method in self.http_method_names
+
     def can_process(self, request):
         """
-        Return True if that mixin can handle the given method.
+        Return True if that mixin can handle the given request.
+        Views precompute the handlers with can_process_method and only call
+        this for each request when it is overridden.
         """
-        return request.method.lower() in self.http_method_names
+        return self.can_process_method(request.method.lower())
 
     def process(self, request, context, **kwargs):
         """
@@ -80,11 +216,55 @@ class Mixin(BaseMixin):
         """
         return self.response_class(
             request=request,
-            template=self.get_template_names(),
+            template=self.get_template(),
             context=context,
             **response_kwargs
         )
 
+    def get_template_cache_key(self):
+        """
+        Returns the key the resolved template is cached under or None if it
+        shouldn't be cached. Mixins whose template names depend on something
+        else than their class, name, mode, model and template settings must
+        override this.
+        """
+        # Overridden template names may depend on the request
+        get_template_names = getattr(type(self).get_template_names,
+            'im_func', None)
+        if not get_template_names in STATIC_TEMPLATE_NAMES:
+            return None
+        return (
+            self.__class__,
+            self.context_object_name,
+            self.mode,
+            getattr(self, 'model', None),
+            self.template_name,
+            getattr(self, 'template_name_prefix', None),
+        )
+
+    def get_template(self):
+        """
+        Returns the template to render. The first existing template of
+        get_template_names() is only looked for once, unless DEBUG or
+        TEMPLATE_DEBUG are on.
+        """
+        key = None
+        if not templates_reload():
+            key = self.get_template_cache_key()
+        if key is None:
+            return self.get_template_names()
+        try:
+            return TEMPLATES[key]
+        except KeyError:
+            pass
+        names = self.get_template_names()
+        try:
+            template = select_template(names)
+        except TemplateDoesNotExist:
+            # Let the response report it when rendered
+            return names
+        return TEMPLATES.setdefault(key, template)
+
     def get_template_names(self):
         """
         Returns a list of template names to be used for the request. Must return
@@ -97,3 +277,6 @@ class Mixin(BaseMixin):
             )
         else:
             return [self.template_name]
+
+
+STATIC_TEMPLATE_NAMES.add(Mixin.get_template_names.im_func)
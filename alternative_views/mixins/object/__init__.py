@@ -1,16 +1,151 @@
 
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Max, Q
+from django.db.models.query import QuerySet
 # from django.utils.translation import ugettext as _
 from django.http import HttpResponseRedirect
 
-from alternative_views.mixins import Mixin
+from alternative_views.mixins import Mixin, STATIC_TEMPLATE_NAMES
 
 from .detail import SingleObjectMixin
 from .list import MultipleObjectMixin
+from .stream import StreamingListMixin
+from .api import JSONListMixin, JSONDetailMixin
+from .related import RelatedLoadsChecker, merge_select_related
+from .bulk import BulkCreateMixin, BulkUpdateMixin
+from .delete import DeleteMixin, BulkDeleteMixin
 from .edit import BaseCreateView, BaseUpdateView
 
 
+# Modes checking the authorization filter against the looked up object
+AUTHORIZED_MODES = ('detail', 'update', 'json_detail', 'delete')
+# Modes displaying several objects
+LIST_MODES = ('list', 'stream', 'json_list', 'bulk_delete')
+# Modes rendered as JSON
+JSON_MODES = ('json_list', 'json_detail')
+# Modes saving submitted forms
+FORM_MODES = ('new', 'update', 'bulk_new', 'bulk_update')
+# Modes deleting objects on POST or DELETE
+DELETE_MODES = ('delete', 'bulk_delete')
+
+
+# Process wide registry of the mode specialised mixin classes.
+# Keys are (mixin class, mode) and values the class built for that mode.
+MODE_CLASSES = {}
+
+
+def get_mode_class(mixin_class, mode):
+    """
+    Returns the class specialising mixin_class for the given mode.
+    Classes are built once and then reused from the registry.
+    """
+    key = (mixin_class, mode)
+    try:
+        return MODE_CLASSES[key]
+    except KeyError:
+        pass
+    if not mode in mixin_class.HERITAGE_PER_MODE:
+        raise NotImplementedError('Unknown mode: %s' % mode)
+    cls_name = "%s%s" % (mode.capitalize(), mixin_class.__name__)
+    heritage = (mixin_class, mixin_class.HERITAGE_PER_MODE[mode])
+    cls = type(cls_name, heritage, {'__module__': mixin_class.__module__})
+    # Another thread may have been faster, always hand back the stored one
+    return MODE_CLASSES.setdefault(key, cls)
+
+
+def prepare_mode_classes(mixin_class, modes=None):
+    """
+    Builds the specialised classes of mixin_class for the given modes (all
+    the known modes by default). Meant to be called at import time.
+    """
+    if modes is None:
+        modes = mixin_class.HERITAGE_PER_MODE.keys()
+    return dict((mode, get_mode_class(mixin_class, mode)) for mode in modes)
+
+
+def registered_mode_classes():
+    """
+    Returns a copy of the registry.
+    """
+    return dict(MODE_CLASSES)
+
+
+def clear_mode_classes():
+    """
+    Empties the registry.
+    """
+    MODE_CLASSES.clear()
+
+
+# Per mode field options of the ObjectMixin
+MODE_FIELDS_OPTIONS = ('only_fields', 'defer_fields', 'select_related',
+    'prefetch_related')
+
+
+def get_relation_names(model):
+    """
+    Returns the names of the model's relations, forward and reverse.
+    """
+    names = set(field.name for field in model._meta.fields if field.rel)
+    names.update(field.name for field in model._meta.many_to_many)
+    for related in model._meta.get_all_related_objects() + \
+            model._meta.get_all_related_many_to_many_objects():
+        names.add(related.get_accessor_name())
+    return names
+
+
+def get_option_names(model, option):
+    """
+    Returns the names allowed as first part of the option's lookups.
+    """
+    if option == 'select_related':
+        return set(field.name for field in model._meta.fields if field.rel)
+    if option == 'prefetch_related':
+        return get_relation_names(model)
+    names = set(['pk'])
+    names.update(field.name for field in model._meta.fields)
+    names.update(field.name for field in model._meta.many_to_many)
+    return names
+
+
+def check_mode_fields(cls):
+    """
+    Checks the modes and fields of the class' per mode field options.
+    """
+    model = cls.model
+    if model is None and cls.queryset is not None:
+        model = cls.queryset.model
+    for option in MODE_FIELDS_OPTIONS:
+        values = getattr(cls, option) or {}
+        for mode, fields in values.iteritems():
+            if not mode in cls.HERITAGE_PER_MODE:
+                raise ImproperlyConfigured(u"%s.%s has an unknown mode %r"
+                    % (cls.__name__, option, mode))
+            if model is None:
+                continue
+            names = get_option_names(model, option)
+            for field in fields:
+                name = field.split('__')[0]
+                if not name in names:
+                    raise ImproperlyConfigured(u"%s.%s: %s has no field %r"
+                        % (cls.__name__, option, model.__name__, name))
+
+
+class ObjectMixinMetaclass(type):
+    """
+    Checks the declared per mode field options when the class is created.
+    """
+    def __new__(cls, name, bases, attrs):
+        new_class = super(ObjectMixinMetaclass, cls).__new__(
+            cls, name, bases, attrs)
+        check_mode_fields(new_class)
+        return new_class
+
+
 class ObjectMixin(Mixin):
+    __metaclass__ = ObjectMixinMetaclass
+
     model = None
     queryset = None
 
@@ -19,6 +154,29 @@ class ObjectMixin(Mixin):
     pk_url_kwarg = 'pk'
 
     template_name_prefix = None
+    # Name of the object's field holding the most specific template name
+    template_name_field = None
+    # Name of the field holding the last modification date (or a version)
+    # of the objects, enables the conditional requests
+    validator_field = None
+
+    # Lookups limiting the objects the user can access: a Q object or a
+    # dict whose values may be callables taking the request, as in
+    # {'members': lambda request: request.user.id}.
+    # List mode filters its queryset with them, detail and update modes
+    # refuse the request if the object doesn't match them.
+    authorization_filter = None
+
+    # Fields to load per mode, as {'list': ('title', 'status')}. The other
+    # fields are only loaded when read.
+    only_fields = None
+    # Fields not to load per mode, as {'list': ('description',)}
+    defer_fields = None
+    # Relations to load along with the objects per mode, as
+    # {'list': ('project', 'milestone')}. They are added to get_queryset's
+    # ones.
+    select_related = None
+    prefetch_related = None
 
     form = None
 
@@ -27,6 +185,13 @@ class ObjectMixin(Mixin):
         'detail': SingleObjectMixin,
         'new': BaseCreateView,
         'update': BaseUpdateView,
+        'stream': StreamingListMixin,
+        'json_list': JSONListMixin,
+        'json_detail': JSONDetailMixin,
+        'bulk_new': BulkCreateMixin,
+        'bulk_update': BulkUpdateMixin,
+        'delete': DeleteMixin,
+        'bulk_delete': BulkDeleteMixin,
     }
 
     def as_mode(self, mode):
@@ -37,12 +202,76 @@ class ObjectMixin(Mixin):
         # Probably another solution would be to copy the current object's dict
         # and push it to the instanced Mixin
         super(ObjectMixin, self).as_mode(mode)
-        if not mode in self.HERITAGE_PER_MODE:
-            raise NotImplementedError('Unknown mode: %s' % mode)
-        cls_name = "%s%s" % (mode.capitalize(), self.__class__.__name__)
-        heritage = (self.__class__, self.HERITAGE_PER_MODE[mode])
-        cls = type(cls_name, heritage, {})
-        self.__class__ = cls
+        self.__class__ = get_mode_class(self.__class__, mode)
+
+    def get_authorization_filter(self, request):
+        """
+        Returns authorization_filter as a Q object or None.
+        """
+        lookups = self.authorization_filter
+        if lookups is None or isinstance(lookups, Q):
+            return lookups
+        resolved = {}
+        for key, value in lookups.iteritems():
+            if callable(value):
+                value = value(request)
+            resolved[key] = value
+        return Q(**resolved)
+
+    def get_mode_fields(self, option):
+        """
+        Returns the fields of a per mode field option for the current mode.
+        """
+        return (getattr(self, option) or {}).get(self.mode)
+
+    def get_projection(self):
+        """
+        Returns the mode's (only fields, deferred fields).
+        """
+        return (self.get_mode_fields('only_fields'),
+            self.get_mode_fields('defer_fields'))
+
+    def adjust_queryset(self, queryset):
+        """
+        Keeps the objects the user can access and the mode's fields, then
+        lets the mode adjust the queryset.
+        """
+        if self.authorization_filter is not None:
+            queryset = queryset.filter(
+                self.get_authorization_filter(self.request))
+        only, defer = self.get_projection()
+        if only:
+            queryset = queryset.only(*only)
+        if defer:
+            queryset = queryset.defer(*defer)
+        select_related = self.get_mode_fields('select_related')
+        if select_related:
+            queryset = merge_select_related(queryset, select_related)
+        prefetch_related = self.get_mode_fields('prefetch_related')
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        parent = super(ObjectMixin, self)
+        if hasattr(parent, 'adjust_queryset'):
+            queryset = parent.adjust_queryset(queryset)
+        return queryset
+
+    def has_authorization(self):
+        authorization = getattr(type(self).authorization, 'im_func', None)
+        if authorization is not ObjectMixin.authorization.im_func:
+            return True
+        return self.authorization_filter is not None and \
+            self.mode in AUTHORIZED_MODES
+
+    def authorization(self, request, context):
+        """
+        Detail and update modes check the object matches the authorization
+        filter with a single query.
+        """
+        if not self.mode in AUTHORIZED_MODES or \
+                self.authorization_filter is None:
+            return None
+        queryset = self.adjust_queryset(self.get_queryset())
+        return queryset.filter(**self.get_object_lookup()).exists()
 
     def get_object_name(self, *args, **kwargs):
         """
@@ -50,6 +279,21 @@ class ObjectMixin(Mixin):
         """
         return self.context_object_name
 
+    def get_context_names(self):
+        """
+        List and detail modes know their context names beforehand.
+        """
+        name = self.get_object_name()
+        if self.mode in ('detail', 'json_detail', 'delete'):
+            return [name]
+        if self.mode in LIST_MODES:
+            names = ['%s_list', '%s_paginator', '%s_page_obj', '%s_is_paginated']
+            if self.mode in ('list', 'json_list') and self.paginate_by and \
+                    self.get_cursor_field():
+                names += ['%s_next_cursor', '%s_prev_cursor']
+            return [n % name for n in names]
+        return None
+
     def get_template_names(self):
         """
         Return a list of template names to be used for the request. Must return
@@ -74,8 +318,26 @@ class ObjectMixin(Mixin):
                 self.get_object_name(),
                 self.mode
             ))
+
+        name = self.get_object_template_name()
+        if name:
+            names.insert(0, name)
         return names
 
+    def get_object_template_name(self):
+        """
+        Returns the template name held by the object's template_name_field.
+        """
+        if self.template_name_field and getattr(self, 'object', None):
+            return getattr(self.object, self.template_name_field, None)
+        return None
+
+    def get_template_cache_key(self):
+        # The object's own template can't be cached
+        if self.get_object_template_name():
+            return None
+        return super(ObjectMixin, self).get_template_cache_key()
+
     def get_context(self, request, context, permissions=None, **kwargs):
         """
         Builds a context for this mixin.
@@ -85,9 +347,99 @@ class ObjectMixin(Mixin):
             request, context, permissions, **kwargs))
         return context
 
+    def evaluate_context(self, context):
+        """
+        Fetches the listed objects. The stream mode reads them by chunks
+        while rendering.
+        """
+        if not self.mode in LIST_MODES or self.mode == 'stream':
+            return
+        object_list = context.get('%s_list' % self.get_object_name())
+        if isinstance(object_list, QuerySet):
+            len(object_list)
+
+    def get_validator(self, request, context):
+        """
+        Detail mode uses the object's validator field, list mode its
+        latest value and the number of objects.
+        """
+        if not self.validator_field:
+            return None
+        if self.mode == 'detail':
+            if getattr(self, 'object', None) is None:
+                # Lazy mixin, keep the object for when it is evaluated
+                self.prefetched_object = self.get_object()
+                self.object = self.prefetched_object
+            value = getattr(self.object, self.validator_field)
+            return ('%s:%s' % (self.object.pk, value), value)
+        if self.mode == 'list':
+            result = self.adjust_queryset(self.get_queryset()).aggregate(
+                last=Max(self.validator_field), count=Count('pk'))
+            return ('%(count)s:%(last)s' % result, result['last'])
+        return None
+
+    def is_form_submission(self, request):
+        return self.mode in FORM_MODES and \
+            request.method in ('POST', 'PUT')
+
+    def is_deletion(self, request):
+        return self.mode in DELETE_MODES and \
+            request.method in ('POST', 'DELETE')
+
+    def get_required_mixins(self, request, specs):
+        """
+        A submitted form only needs the mixins this one requires to be
+        saved, and a deletion to be done - the detail mixins preceding it
+        if it doesn't declare them. The others are only useful to display
+        the page.
+        """
+        if not self.is_form_submission(request) and \
+                not self.is_deletion(request):
+            return None
+        if self.requires is not None:
+            return [spec.name for spec in specs if spec.name in self.requires]
+        names = []
+        for spec in specs:
+            if spec.name == self.context_object_name:
+                break
+            if not spec.mode in LIST_MODES:
+                names.append(spec.name)
+        return names
+
+    def needs_full_context(self, request, context):
+        if self.is_form_submission(request):
+            return not self.form.is_valid()
+        return not self.is_deletion(request)
+
+    def render_to_response(self, request, context, **response_kwargs):
+        if self.mode == 'stream':
+            return self.render_stream(request, context, **response_kwargs)
+        if self.mode in JSON_MODES:
+            return self.render_json(request, context, **response_kwargs)
+        response = super(ObjectMixin, self).render_to_response(
+            request, context, **response_kwargs)
+        if settings.DEBUG and hasattr(response, 'add_post_render_callback'):
+            objects = self.get_rendered_objects(context)
+            if objects is not None:
+                response.add_post_render_callback(
+                    RelatedLoadsChecker(self, objects))
+        return response
+
+    def get_rendered_objects(self, context):
+        """
+        Returns the object or objects the template displays.
+        """
+        if self.mode == 'list':
+            return context.get('%s_list' % self.get_object_name())
+        return getattr(self, 'object', None)
+
     def process(self, request, context, **kwargs):
-        if self.mode == 'new' and self.form.is_valid():
-            return HttpResponseRedirect(self.get_success_url())
-        if self.mode == 'update' and self.form.is_valid():
+        if self.mode in FORM_MODES and self.form.is_valid():
             return HttpResponseRedirect(self.get_success_url())
+        if self.is_deletion(request):
+            self.delete_objects()
+            return self.get_delete_response()
         return super(ObjectMixin, self).process(request, context, **kwargs)
+
+
+STATIC_TEMPLATE_NAMES.add(ObjectMixin.get_template_names.im_func)
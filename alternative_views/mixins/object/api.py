@@ -0,0 +1,79 @@
+"""
+JSON modes.
+
+The objects are read with values() - only the json_fields, which the mixins
+have to declare - and dumped straight into the response body, without model
+instances, templates or context processors.
+"""
+
+from django import http
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import simplejson
+
+from .detail import SingleObjectMixin
+from .list import MultipleObjectMixin
+
+
+class JSONMixin(object):
+    json_fields = None
+    json_content_type = 'application/json'
+
+    def get_json_fields(self):
+        """
+        Returns the fields to read. There is no default, dumping every
+        column could expose data the view doesn't mean to.
+        """
+        if not self.json_fields:
+            raise ImproperlyConfigured(u"'%s' must define 'json_fields'"
+                                       % self.__class__.__name__)
+        return list(self.json_fields)
+
+    def adjust_queryset(self, queryset):
+        parent = super(JSONMixin, self)
+        if hasattr(parent, 'adjust_queryset'):
+            queryset = parent.adjust_queryset(queryset)
+        return queryset.values(*self.get_json_fields())
+
+    def render_json(self, request, context, **response_kwargs):
+        """
+        Returns a response holding the JSON dump of get_json_data.
+        """
+        response_kwargs.setdefault('content_type', self.json_content_type)
+        return http.HttpResponse(
+            simplejson.dumps(self.get_json_data(context),
+                cls=DjangoJSONEncoder),
+            **response_kwargs)
+
+
+class JSONListMixin(JSONMixin, MultipleObjectMixin):
+
+    def get_json_fields(self):
+        fields = super(JSONListMixin, self).get_json_fields()
+        # The cursors are read from the objects
+        cursor_field = self.paginate_by and self.get_cursor_field()
+        if cursor_field:
+            name = cursor_field.lstrip('-')
+            if not name in fields:
+                fields.append(name)
+        return fields
+
+    def get_json_data(self, context):
+        name = self.get_object_name()
+        data = {'objects': list(context['%s_list' % name])}
+        paginator = context['%s_paginator' % name]
+        if paginator is not None:
+            data['count'] = paginator.count
+            data['num_pages'] = paginator.num_pages
+            data['page'] = context['%s_page_obj' % name].number
+        for cursor in ('next_cursor', 'prev_cursor'):
+            key = '%s_%s' % (name, cursor)
+            if key in context:
+                data[cursor] = context[key]
+        return data
+
+
+class JSONDetailMixin(JSONMixin, SingleObjectMixin):
+
+    def get_json_data(self, context):
+        return context[self.get_object_name()]
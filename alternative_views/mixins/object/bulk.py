@@ -0,0 +1,331 @@
+"""
+Bulk modes: create or update many objects with a model formset.
+
+The valid rows are written in a single transaction: with bulk_create for
+the new objects, and with an UPDATE per group of objects sharing the same
+changes for the existing ones. Like those, the modes don't call the
+objects' save method nor send signals, and don't save many to many
+fields. The fields' pre_save hooks still run: auto_now dates are set and
+uploaded files stored.
+
+The objects' foreign keys to the objects of the view's detail mixins,
+like the current project, are left out of the forms and set
+automatically.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.validators import EMPTY_VALUES
+from django.db import transaction
+from django.db.models import ForeignKey
+from django.forms import models as model_forms
+from django.utils.datastructures import SortedDict
+from django.utils.encoding import smart_unicode
+
+from alternative_views.cache import invalidate
+
+from .edit import ModelFormMixin
+from .joins import JOINABLE_MODES, find_link
+
+
+# Formset classes built for the bulk modes, keyed on the model, form class
+# and options.
+FORMSET_CLASSES = {}
+
+
+class PrefetchedChoiceField(model_forms.ModelChoiceField):
+    """
+    ModelChoiceField looking its value up in the objects its formset fetched
+    for all the forms at once.
+    """
+    # Objects keyed on the unicode of their to_field_name value, None to
+    # query them one by one
+    objects = None
+
+    def to_python(self, value):
+        if self.objects is None or value in EMPTY_VALUES:
+            return super(PrefetchedChoiceField, self).to_python(value)
+        try:
+            return self.objects[smart_unicode(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'])
+
+
+def get_formfield(field, **kwargs):
+    """
+    Formfield callback of the bulk formsets.
+    """
+    if isinstance(field, ForeignKey):
+        kwargs.setdefault('form_class', PrefetchedChoiceField)
+    return field.formfield(**kwargs)
+
+
+class PrefetchedChoicesFormMixin(object):
+    """
+    Skips the model validation of the foreign keys whose form field already
+    checked the value against the prefetched objects. Unique checks still
+    include them.
+    """
+    _skip_prefetched = False
+
+    def _get_validation_exclusions(self):
+        exclude = super(PrefetchedChoicesFormMixin,
+            self)._get_validation_exclusions()
+        if self._skip_prefetched:
+            exclude.extend(name for name, field in self.fields.iteritems()
+                if isinstance(field, PrefetchedChoiceField) and
+                    field.objects is not None and not name in exclude)
+        return exclude
+
+    def _post_clean(self):
+        self._skip_prefetched = True
+        try:
+            super(PrefetchedChoicesFormMixin, self)._post_clean()
+        finally:
+            self._skip_prefetched = False
+
+    def validate_unique(self):
+        self._skip_prefetched = False
+        super(PrefetchedChoicesFormMixin, self).validate_unique()
+
+
+class BaseBulkFormSet(model_forms.BaseModelFormSet):
+    """
+    Model formset validating the primary keys and foreign keys of all its
+    forms with a query per field, instead of queries per form and field.
+    Only the objects of its queryset can be updated.
+    """
+
+    def initial_form_count(self):
+        count = super(BaseBulkFormSet, self).initial_form_count()
+        if self.is_bound:
+            # The submitted count can't exceed the updatable objects
+            count = min(count, len(self.get_queryset()))
+        return count
+
+    def add_fields(self, form, index):
+        super(BaseBulkFormSet, self).add_fields(form, index)
+        name = self._pk_field.name
+        field = form.fields.get(name)
+        if type(field) is model_forms.ModelChoiceField:
+            form.fields[name] = PrefetchedChoiceField(self.get_queryset(),
+                initial=field.initial, required=False, widget=field.widget)
+
+    def get_choice_values(self):
+        """
+        Returns the submitted values of the prefetched fields, keyed on the
+        field name, along with the field of the first form.
+        """
+        values = SortedDict()
+        for form in self.forms:
+            for name, field in form.fields.iteritems():
+                if not isinstance(field, PrefetchedChoiceField):
+                    continue
+                value = form._raw_value(name)
+                if not value in EMPTY_VALUES:
+                    values.setdefault(name, (field, set()))[1].add(value)
+        return values
+
+    def prefetch_choices(self):
+        """
+        Fetches the objects the forms' choice fields refer to.
+        """
+        for name, (field, values) in self.get_choice_values().iteritems():
+            key = field.to_field_name or 'pk'
+            if name == self._pk_field.name:
+                # Already fetched to build the forms
+                objects = list(self.get_queryset())
+            else:
+                try:
+                    objects = list(field.queryset.filter(
+                        **{'%s__in' % key: list(values)}))
+                except (ValueError, TypeError, ValidationError):
+                    # Let each form report its invalid value
+                    continue
+            objects = dict((smart_unicode(getattr(obj, key)), obj)
+                for obj in objects)
+            for form in self.forms:
+                if name in form.fields:
+                    form.fields[name].objects = objects
+
+    def full_clean(self):
+        if self.is_bound:
+            self.prefetch_choices()
+        super(BaseBulkFormSet, self).full_clean()
+
+
+def get_modelformset_class(model, form, fields=None, exclude=None, extra=1):
+    """
+    Returns a model formset class for the model and options. Classes are
+    built once by modelformset_factory and then reused.
+    """
+    key = (
+        model,
+        form,
+        tuple(fields) if fields is not None else None,
+        tuple(exclude) if exclude is not None else None,
+        extra,
+    )
+    try:
+        return FORMSET_CLASSES[key]
+    except KeyError:
+        pass
+    form = type(form.__name__, (PrefetchedChoicesFormMixin, form), {})
+    formset_class = model_forms.modelformset_factory(model, form=form,
+        formfield_callback=get_formfield, formset=BaseBulkFormSet,
+        fields=fields, exclude=exclude, extra=extra)
+    return FORMSET_CLASSES.setdefault(key, formset_class)
+
+
+def clear_formset_classes():
+    """
+    Empties the formset classes cache.
+    """
+    FORMSET_CLASSES.clear()
+
+
+class BulkFormMixin(ModelFormMixin):
+    # Empty forms displayed
+    bulk_extra = 1
+    # Rows written per query, None for all of them at once
+    bulk_batch_size = 500
+
+    def get_parent_objects(self):
+        """
+        Returns the objects of the view's detail mixins this mixin's model
+        has a foreign key to, keyed on the foreign key name.
+        """
+        view = self.__dict__.get('view')
+        if view is None or self.model is None:
+            return {}
+        parents = {}
+        for spec in view.plan.mixins:
+            if spec.name == self.context_object_name or \
+                    not spec.mode in JOINABLE_MODES:
+                continue
+            model = getattr(spec.mixin, 'model', None)
+            if model is None:
+                continue
+            field_name = find_link(self.model, spec.name, model)
+            obj = view.context.get(spec.name)
+            if field_name and isinstance(obj, model):
+                parents[field_name] = obj
+        return parents
+
+    def get_formset_class(self):
+        exclude = list(self.exclude or ())
+        exclude.extend(name for name in self.parents if not name in exclude)
+        return get_modelformset_class(self.get_queryset().model,
+            self.get_form_class(), fields=self.fields,
+            exclude=exclude or None, extra=self.bulk_extra)
+
+    def get_formset_queryset(self):
+        raise NotImplementedError
+
+    def get_formset(self):
+        kwargs = {
+            'queryset': self.get_formset_queryset(),
+            'prefix': self.get_object_name(),
+        }
+        if self.request.method in ('POST', 'PUT'):
+            kwargs.update({
+                'data': self.request.POST,
+                'files': self.request.FILES,
+            })
+        return self.get_formset_class()(**kwargs)
+
+    def get_success_url(self):
+        return super(ModelFormMixin, self).get_success_url()
+
+    def save_formset(self, formset):
+        raise NotImplementedError
+
+    def get_context(self, request, context, permissions, **kwargs):
+        self.object = None
+        self.parents = self.get_parent_objects()
+        formset = self.get_formset()
+        # Read by the view to know if the submission is valid
+        self.form = formset
+        if request.method in ('POST', 'PUT') and formset.is_valid():
+            using = formset.model._default_manager.db
+            with transaction.commit_on_success(using=using):
+                self.objects = self.save_formset(formset)
+        context['%s_formset' % self.get_object_name()] = formset
+        return context
+
+
+class BulkCreateMixin(BulkFormMixin):
+
+    def get_formset_queryset(self):
+        return self.get_queryset().none()
+
+    def save_formset(self, formset):
+        """
+        Creates the filled forms' objects with bulk_create.
+        """
+        objects = formset.save(commit=False)
+        for obj in objects:
+            for name, parent in self.parents.iteritems():
+                setattr(obj, name, parent)
+        model = formset.model
+        model._default_manager.bulk_create(objects,
+            batch_size=self.bulk_batch_size)
+        invalidate(model)
+        return objects
+
+
+class BulkUpdateMixin(BulkFormMixin):
+
+    def get_formset_queryset(self):
+        return self.adjust_queryset(self.get_queryset())
+
+    def get_changes(self, obj, changed_data):
+        """
+        Returns the (field name, value) pairs of the changed model fields,
+        as their pre_save hook returns them (storing the uploaded files).
+        """
+        return tuple((field.name, field.pre_save(obj, False))
+            for field in obj._meta.fields if field.name in changed_data)
+
+    def get_auto_changes(self, objects):
+        """
+        Returns the (field name, value) pairs of the fields set on every
+        save, like auto_now dates, with the same value for all the objects.
+        """
+        changes = []
+        for field in objects[0]._meta.fields:
+            if getattr(field, 'auto_now', False):
+                value = field.pre_save(objects[0], False)
+                for obj in objects[1:]:
+                    setattr(obj, field.attname, value)
+                changes.append((field.name, value))
+        return tuple(changes)
+
+    def save_formset(self, formset):
+        """
+        Updates the changed objects with an UPDATE per group of objects
+        having the same changes.
+        """
+        objects = formset.save(commit=False)
+        changed = []
+        for obj, changed_data in formset.changed_objects:
+            changes = self.get_changes(obj, changed_data)
+            if changes:
+                changed.append((obj, changes))
+        groups = SortedDict()
+        if changed:
+            auto_changes = self.get_auto_changes(
+                [obj for obj, changes in changed])
+            for obj, changes in changed:
+                groups.setdefault(changes + auto_changes, []).append(obj.pk)
+        model = formset.model
+        batch_size = self.bulk_batch_size or None
+        pks = []
+        for changes, group in groups.iteritems():
+            values = dict(changes)
+            for start in range(0, len(group), batch_size or len(group)):
+                batch = group[start:start + batch_size] if batch_size \
+                    else group
+                model._default_manager.filter(pk__in=batch).update(**values)
+            pks.extend(group)
+        invalidate(model, pks)
+        return objects
@@ -0,0 +1,73 @@
+"""
+Ways to count the rows of a paginated queryset.
+"""
+
+import re
+
+from hashlib import md5
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models.sql.datastructures import EmptyResultSet
+
+
+ESTIMATE_RE = re.compile(r'rows=(\d+)')
+
+
+def get_sql(queryset):
+    """
+    Returns the queryset's SQL and parameters.
+    """
+    return queryset.query.get_compiler(queryset.db).as_sql()
+
+
+def exact_count(queryset):
+    """
+    Runs a COUNT query.
+    """
+    return queryset.count()
+
+
+def cached_count(queryset, timeout=None):
+    """
+    Returns the count from the cache, keyed on the queryset's SQL, or runs
+    a COUNT query and stores the result for timeout seconds.
+    """
+    try:
+        sql, params = get_sql(queryset)
+    except EmptyResultSet:
+        return 0
+    key = 'alternative_views:count:%s' % md5(
+        '%s:%s:%r' % (queryset.db, sql, params)).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = exact_count(queryset)
+        cache.set(key, count, timeout)
+    return count
+
+
+def estimated_count(queryset):
+    """
+    Returns the row count the database planner expects for the queryset.
+    Only PostgreSQL gives such an estimate, other databases - typically a
+    local sqlite - get an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        try:
+            sql, params = get_sql(queryset)
+        except EmptyResultSet:
+            return 0
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN %s' % sql, params)
+        match = ESTIMATE_RE.search(cursor.fetchone()[0])
+        if match:
+            return int(match.group(1))
+    return exact_count(queryset)
+
+
+COUNT_STRATEGIES = {
+    'exact': exact_count,
+    'cached': cached_count,
+    'estimated': estimated_count,
+}
@@ -0,0 +1,164 @@
+"""
+Delete modes.
+
+The objects are deleted with a single collector built from the mixin's
+queryset, so get_queryset (and the authorization filter) limit what can be
+deleted. The response reports the deleted objects per model, cascades
+included, in the X-Deleted-Objects header.
+
+Mixins with a delete_background_threshold first count the cascade with a
+COUNT query per cascading relation. Larger deletions are handed to the
+background worker with the objects' primary keys, the worker collects the
+cascade itself when it runs them.
+"""
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import router
+from django.db.models.deletion import CASCADE, Collector
+from django.http import Http404, HttpResponseRedirect
+from django.utils.translation import ugettext as _
+
+from alternative_views import worker
+from alternative_views.cache import get_model_label
+
+from .detail import SingleObjectMixin
+from .list import MultipleObjectMixin
+
+
+def get_deleted_counts(collector):
+    """
+    Returns the number of collected objects per model label.
+    """
+    counts = {}
+    for model, instances in collector.data.iteritems():
+        if instances:
+            counts[get_model_label(model)] = len(instances)
+    return counts
+
+
+def count_cascade(queryset):
+    """
+    Returns the number of objects deleting the queryset would delete per
+    model label, without fetching them. Objects reached by several
+    relations are counted for each one.
+    """
+    counts = {}
+    pending = [(queryset, ())]
+    while pending:
+        queryset, path = pending.pop()
+        count = queryset.count()
+        if not count:
+            continue
+        model = queryset.model
+        label = get_model_label(model)
+        counts[label] = counts.get(label, 0) + count
+        path = path + (model,)
+        for related in model._meta.get_all_related_objects(
+                include_hidden=True):
+            field = related.field
+            if field.rel.on_delete is not CASCADE or related.model in path:
+                continue
+            values = queryset.values(field.rel.field_name)
+            pending.append((related.model._base_manager.using(queryset.db
+                ).filter(**{'%s__in' % field.name: values}), path))
+    return counts
+
+
+def delete_pks(model, pks, using):
+    """
+    Deletes the model's objects with the given primary keys and their
+    cascades, as they are when it runs.
+    """
+    collector = Collector(using=using)
+    collector.collect(model._base_manager.using(using).filter(pk__in=pks))
+    collector.delete()
+
+
+class DeleteObjectsMixin(object):
+    success_url = None
+    # Deletions of more objects than this, cascades included, are run by
+    # the background worker. None to always delete them right away without
+    # counting them first.
+    delete_background_threshold = None
+
+    deleted_counts = None
+    delete_queued = False
+
+    def get_delete_queryset(self):
+        raise NotImplementedError
+
+    def get_success_url(self):
+        if self.success_url:
+            return self.success_url
+        raise ImproperlyConfigured(
+            "No URL to redirect to. Provide a success_url.")
+
+    def delete_objects(self):
+        """
+        Deletes the objects and their cascades, or queues the deletion if
+        there are too many of them.
+        """
+        queryset = self.get_delete_queryset()
+        using = router.db_for_write(queryset.model)
+        threshold = self.delete_background_threshold
+        if threshold is not None:
+            counts = count_cascade(queryset.using(using))
+            if sum(counts.values()) > threshold:
+                self.deleted_counts = counts
+                self.delete_queued = True
+                worker.submit(delete_pks, queryset.model,
+                    list(queryset.values_list('pk', flat=True)), using)
+                return
+        collector = Collector(using=using)
+        collector.collect(queryset)
+        self.deleted_counts = get_deleted_counts(collector)
+        if not self.deleted_counts:
+            raise Http404(_(u"No %(verbose_name)s found matching the query") %
+                          {'verbose_name': queryset.model._meta.verbose_name})
+        collector.delete()
+
+    def get_delete_response(self):
+        response = HttpResponseRedirect(self.get_success_url())
+        response['X-Deleted-Objects'] = ', '.join('%s=%i' % item
+            for item in sorted(self.deleted_counts.items()))
+        if self.delete_queued:
+            response['X-Delete-Queued'] = 'true'
+        return response
+
+
+class DeleteMixin(DeleteObjectsMixin, SingleObjectMixin):
+
+    def get_delete_queryset(self):
+        queryset = self.adjust_queryset(self.get_queryset())
+        return queryset.filter(**self.get_object_lookup())
+
+
+class BulkDeleteMixin(DeleteObjectsMixin, MultipleObjectMixin):
+    ids_parameter = 'ids'
+
+    def get_ids(self, model):
+        """
+        Returns the primary keys of the objects to delete, from the POST
+        data or the query string of the other methods, like DELETE.
+        """
+        if self.request.method == 'POST':
+            data = self.request.POST
+        else:
+            data = self.request.GET
+        field = model._meta.pk
+        try:
+            return [field.to_python(value)
+                for value in data.getlist(self.ids_parameter)]
+        except ValidationError:
+            raise Http404(_(u"Invalid %(parameter)s") % {
+                'parameter': self.ids_parameter})
+
+    def adjust_queryset(self, queryset):
+        """
+        Keeps the requested objects.
+        """
+        queryset = super(BulkDeleteMixin, self).adjust_queryset(queryset)
+        return queryset.filter(pk__in=self.get_ids(queryset.model))
+
+    def get_delete_queryset(self):
+        return self.adjust_queryset(self.get_queryset())
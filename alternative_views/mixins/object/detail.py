@@ -1,7 +1,11 @@
+from django.core.cache import get_cache
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.db.models.query import ValuesQuerySet
 from django.http import Http404
 from django.utils.encoding import smart_str
 from django.utils.translation import ugettext as _
+from alternative_views.cache import (cache_object, get_cached_object,
+    get_queryset_shape, is_watching_objects)
 from .base import TemplateResponseMixin, ContextMixin, View
 
 
@@ -15,29 +19,32 @@ class SingleObjectMixin(ContextMixin):
     context_object_name = None
     slug_url_kwarg = 'slug'
     pk_url_kwarg = 'pk'
-
-    def get_object(self, queryset=None):
+    # Object already fetched by the view, returned by get_object
+    prefetched_object = None
+    # Previous detail mixins whose object get_queryset only filters on by
+    # primary key, like filter(project=self.project). The view may fetch
+    # them along with this mixin's object, see joins.
+    join_lookups = ()
+    # Cache the objects for that many seconds. Saving or deleting them
+    # evicts them. Only the objects of the declared model or queryset are
+    # cached.
+    object_cache_timeout = None
+    object_cache_alias = 'default'
+
+    def get_object_lookup(self):
         """
-        Returns the object the view is displaying.
-
-        By default this requires `self.queryset` and a `pk` or `slug` argument
-        in the URLconf, but subclasses can override this to return any object.
+        Returns the lookup arguments selecting the object from the URLconf
+        arguments.
         """
-        # Use a custom queryset if provided; this is required for subclasses
-        # like DateDetailView
-        if queryset is None:
-            queryset = self.get_queryset()
-
         # Next, try looking up by primary key.
         pk = self.kwargs.get(self.pk_url_kwarg, None)
         slug = self.kwargs.get(self.slug_url_kwarg, None)
         if pk is not None:
-            queryset = queryset.filter(pk=pk)
+            return {'pk': pk}
 
         # Next, try looking up by slug.
         elif slug is not None:
-            slug_field = self.get_slug_field()
-            queryset = queryset.filter(**{slug_field: slug})
+            return {self.get_slug_field(): slug}
 
         # If none of those are defined, it's an error.
         else:
@@ -45,6 +52,26 @@ class SingleObjectMixin(ContextMixin):
                                  u"either an object pk or a slug."
                                  % self.__class__.__name__)
 
+    def get_object(self, queryset=None):
+        """
+        Returns the object the view is displaying.
+
+        By default this requires `self.queryset` and a `pk` or `slug` argument
+        in the URLconf, but subclasses can override this to return any object.
+        """
+        # Use a custom queryset if provided; this is required for subclasses
+        # like DateDetailView
+        if queryset is None:
+            if self.prefetched_object is not None:
+                return self.prefetched_object
+            queryset = self.adjust_queryset(self.get_queryset())
+            # values() rows aren't objects, they aren't cached
+            if self.object_cache_timeout and \
+                    not isinstance(queryset, ValuesQuerySet):
+                return self.get_cached_object(queryset)
+
+        queryset = queryset.filter(**self.get_object_lookup())
+
         try:
             obj = queryset.get()
         except ObjectDoesNotExist:
@@ -52,6 +79,39 @@ class SingleObjectMixin(ContextMixin):
                           {'verbose_name': queryset.model._meta.verbose_name})
         return obj
 
+    def adjust_queryset(self, queryset):
+        """
+        Hook applied to get_queryset's result before the object is looked
+        up.
+        """
+        return queryset
+
+    def get_cached_object(self, queryset):
+        """
+        Returns the object from the cache, or fetches it from the queryset
+        and caches it.
+        The queryset may be restricted - to the objects a user can see for
+        example - so a cached object is only returned if the queryset still
+        has it.
+        """
+        model = queryset.model
+        if not is_watching_objects(model, self.object_cache_alias):
+            # Nothing would evict it, see alternative_views.plan.watch_plan
+            return self.get_object(queryset)
+        lookup = self.get_object_lookup()
+        cache = get_cache(self.object_cache_alias)
+        shape = get_queryset_shape(queryset)
+        obj = get_cached_object(cache, model, lookup, shape)
+        if obj is None:
+            obj = self.get_object(queryset)
+            cache_object(cache, model, obj, lookup, self.object_cache_timeout,
+                shape)
+        elif queryset.query.where and \
+                not queryset.filter(pk=obj.pk).exists():
+            raise Http404(_(u"No %(verbose_name)s found matching the query") %
+                          {'verbose_name': model._meta.verbose_name})
+        return obj
+
     def get_queryset(self):
         """
         Get the queryset to look an object up against. May not be called if
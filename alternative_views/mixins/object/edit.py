@@ -6,6 +6,42 @@ from .detail import (SingleObjectMixin,
                         SingleObjectTemplateResponseMixin, BaseDetailView)
 
 
+# Form classes built for the ModelFormMixin, keyed on the model and the
+# fields, exclude and widgets options.
+FORM_CLASSES = {}
+
+
+def get_modelform_class(model, fields=None, exclude=None, widgets=None):
+    """
+    Returns a ModelForm class for the model and options. Classes are built
+    once by modelform_factory and then reused.
+    """
+    key = (
+        model,
+        tuple(fields) if fields is not None else None,
+        tuple(exclude) if exclude is not None else None,
+        widgets and tuple(sorted(widgets.items())) or None,
+    )
+    try:
+        return FORM_CLASSES[key]
+    except KeyError:
+        pass
+    form = model_forms.ModelForm
+    if widgets:
+        meta = type('Meta', (object,), {'widgets': widgets})
+        form = type('%sBaseForm' % model.__name__, (form,), {'Meta': meta})
+    form_class = model_forms.modelform_factory(model, form=form,
+        fields=fields, exclude=exclude)
+    return FORM_CLASSES.setdefault(key, form_class)
+
+
+def clear_form_classes():
+    """
+    Empties the form classes cache.
+    """
+    FORM_CLASSES.clear()
+
+
 class FormMixin(ContextMixin):
     """
     A mixin that provides a way to show and handle a form in a request.
@@ -15,6 +51,8 @@ class FormMixin(ContextMixin):
     form_class = None
     success_url = None
 
+    request_state = ('initial',)
+
     def get_initial(self):
         """
         Returns the initial data to use for forms on this view.
@@ -68,6 +106,11 @@ class ModelFormMixin(FormMixin, SingleObjectMixin):
     A mixin that provides a way to show and handle a modelform in a request.
     """
 
+    # Options for the form class built when form_class isn't set
+    fields = None
+    exclude = None
+    widgets = None
+
     def get_form_class(self):
         """
         Returns the form class to use in this view
@@ -86,7 +129,8 @@ class ModelFormMixin(FormMixin, SingleObjectMixin):
                 # Try to get a queryset and extract the model class
                 # from that
                 model = self.get_queryset().model
-            return model_forms.modelform_factory(model)
+            return get_modelform_class(model, fields=self.fields,
+                exclude=self.exclude, widgets=self.widgets)
 
     def get_form_kwargs(self):
         """
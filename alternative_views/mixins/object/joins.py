@@ -0,0 +1,151 @@
+"""
+Folds the lookups of chained detail mixins into a single query.
+
+With a project -> milestone -> bug view, the bug's queryset filters on the
+milestone and the project fetched by the previous mixins, which costs a
+query per mixin. When the bug mixin declares those lookups in join_lookups
+and its model has foreign keys to the previous mixins' models, the bug is
+fetched along with them instead:
+
+    Bug.objects.filter(pk=bug_id, ...)
+        .filter(project__in=<project mixin's queryset>.filter(pk=project_id))
+        .filter(milestone__in=<milestone mixin's queryset>.filter(pk=...))
+        .select_related('project', 'milestone')
+"""
+
+from django.db.models import ForeignKey
+from django.db.models.query_utils import deferred_class_factory
+from django.http import Http404
+from django.utils.translation import ugettext as _
+
+from .detail import SingleObjectMixin
+from .related import merge_select_related
+
+
+JOINABLE_MODES = ('detail', 'update')
+
+
+def is_joinable(spec):
+    mixin = spec.mixin
+    if not spec.mode in JOINABLE_MODES:
+        return False
+    if not isinstance(mixin, SingleObjectMixin) or mixin.model is None:
+        return False
+    # Deferred fields can't be followed by select_related
+    get_projection = getattr(mixin, 'get_projection', None)
+    if get_projection is not None and any(get_projection()):
+        return False
+    # Don't bypass a custom get_object
+    get_object = getattr(type(mixin).get_object, 'im_func', None)
+    return get_object is SingleObjectMixin.get_object.im_func
+
+
+def find_link(model, name, parent_model):
+    """
+    Returns the name of model's foreign key to parent_model, preferring the
+    one called like the parent mixin. Returns None if there is no such key
+    or if the choice is ambiguous.
+    """
+    fields = [field.name for field in model._meta.fields
+        if isinstance(field, ForeignKey) and field.rel.to is parent_model]
+    if name in fields:
+        return name
+    if len(fields) == 1:
+        return fields[0]
+    return None
+
+
+def find_lookup_chain(specs):
+    """
+    Returns (child name, ((parent name, field name), ...)) for the last
+    joinable mixin of the plan specs and the previous ones it declares in
+    join_lookups and has a foreign key to, or None if there is nothing to
+    fold.
+    """
+    joinable = [spec for spec in specs if is_joinable(spec)]
+    if len(joinable) < 2:
+        return None
+    child = joinable[-1]
+    links = []
+    for spec in joinable[:-1]:
+        if not spec.name in child.mixin.join_lookups:
+            continue
+        field_name = find_link(child.mixin.model, spec.name, spec.mixin.model)
+        if field_name:
+            links.append((spec.name, field_name))
+    if not links:
+        return None
+    return (child.name, tuple(links))
+
+
+def get_placeholder(model, pk):
+    """
+    Returns an instance of model with only its primary key loaded.
+    """
+    pk_name = model._meta.pk.attname
+    deferred = [field.attname for field in model._meta.fields
+        if field.attname != pk_name]
+    if not deferred:
+        return model(pk=pk)
+    return deferred_class_factory(model, deferred)(pk=pk)
+
+
+def fetch_lookup_chain(chain, mixins, request):
+    """
+    Fetches the chain's objects with one query and stores them as the
+    mixins' prefetched_object.
+    Nothing is folded if a parent is looked up by something else than its
+    pk: the child's queryset needs all of them.
+    """
+    child_name, links = chain
+    child = mixins[child_name]
+    parents = []
+    for parent_name, field_name in links:
+        parent = mixins[parent_name]
+        try:
+            lookup = parent.get_object_lookup()
+        except AttributeError:
+            return
+        if lookup.keys() != ['pk']:
+            return
+        parents.append((parent_name, field_name, parent, lookup))
+
+    # The querysets may filter on the previous objects, give them
+    # placeholders carrying the primary key until the real ones are known.
+    # Their other fields are deferred: reading one costs a query but
+    # doesn't give a wrong value.
+    placeholders = []
+    for i, (parent_name, field_name, parent, lookup) in enumerate(parents):
+        placeholder = get_placeholder(parent.model, lookup['pk'])
+        for mixin in [p[2] for p in parents[i + 1:]] + [child]:
+            if not parent_name in mixin.__dict__:
+                setattr(mixin, parent_name, placeholder)
+                placeholders.append((mixin, parent_name))
+
+    try:
+        child.request = request
+        queryset = child.adjust_queryset(child.get_queryset()).filter(
+            **child.get_object_lookup())
+        for parent_name, field_name, parent, lookup in parents:
+            parent.request = request
+            parent_queryset = parent.adjust_queryset(parent.get_queryset())
+            queryset = queryset.filter(**{
+                '%s__in' % field_name: parent_queryset.filter(**lookup)
+            })
+        lookups = [p[1] for p in parents]
+        get_mode_fields = getattr(child, 'get_mode_fields', None)
+        if get_mode_fields is not None:
+            lookups.extend(get_mode_fields('select_related') or ())
+        queryset = merge_select_related(queryset, lookups)
+        try:
+            obj = queryset.get()
+        except queryset.model.DoesNotExist:
+            raise Http404(_(u"No %(verbose_name)s found matching the query") %
+                          {'verbose_name': queryset.model._meta.verbose_name})
+    finally:
+        for mixin, parent_name in placeholders:
+            delattr(mixin, parent_name)
+
+    child.prefetched_object = obj
+    for parent_name, field_name, parent, lookup in parents:
+        parent.prefetched_object = getattr(obj, field_name)
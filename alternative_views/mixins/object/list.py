@@ -1,9 +1,12 @@
+import base64
+
 from django.core.paginator import Paginator, InvalidPage
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.http import Http404
 from django.utils.encoding import smart_str
 from django.utils.translation import ugettext as _
 from .base import TemplateResponseMixin, ContextMixin, View
+from .count import COUNT_STRATEGIES
 
 
 class MultipleObjectMixin(ContextMixin):
@@ -13,6 +16,13 @@ class MultipleObjectMixin(ContextMixin):
     paginate_by = None
     context_object_name = None
     paginator_class = Paginator
+    # Unique field to order on for a keyset (cursor) pagination, prefixed
+    # by '-' for a descending order. Pages are used if None.
+    cursor_field = None
+    # How the paginator counts the rows: 'exact', 'cached', 'estimated' or
+    # a callable taking the queryset
+    count_strategy = 'exact'
+    count_cache_timeout = 60
 
     def get_queryset(self):
         """
@@ -30,6 +40,12 @@ class MultipleObjectMixin(ContextMixin):
                                        % self.__class__.__name__)
         return queryset
 
+    def adjust_queryset(self, queryset):
+        """
+        Hook applied to the queryset before it is paginated and displayed.
+        """
+        return queryset
+
     def paginate_queryset(self, queryset, page_size):
         """
         Paginate the queryset, if needed.
@@ -51,6 +67,89 @@ class MultipleObjectMixin(ContextMixin):
                                 'page_number': page_number
             })
 
+    def get_cursor_field(self):
+        """
+        Get the unique field used for the cursor pagination, or ``None`` to
+        use the page based one.
+        """
+        return self.cursor_field
+
+    def encode_cursor(self, value):
+        """
+        Returns an opaque cursor for the given value.
+        """
+        return base64.urlsafe_b64encode(smart_str(value))
+
+    def decode_cursor(self, cursor, field):
+        """
+        Returns the value a cursor holds, converted for the model field.
+        """
+        try:
+            return field.to_python(base64.urlsafe_b64decode(smart_str(cursor)))
+        except (TypeError, ValueError, ValidationError):
+            raise Http404(_(u"Invalid cursor (%(cursor)s)") % {
+                                'cursor': cursor
+            })
+
+    def get_cursor(self, name):
+        return self.kwargs.get(name) or self.request.GET.get(name) or None
+
+    def get_cursor_value(self, obj, name):
+        """
+        Returns the cursor field's value of an object or a values() row.
+        """
+        if isinstance(obj, dict):
+            return obj[name]
+        return getattr(obj, name)
+
+    def paginate_queryset_by_cursor(self, queryset, page_size):
+        """
+        Paginate the queryset by seeking the rows after (or before) the
+        cursor given in the 'after' (or 'before') argument.
+        Unlike paginate_queryset, this doesn't count the rows nor uses an
+        offset. Returns the object list and the cursors of the next and
+        previous pages.
+        """
+        field = self.get_cursor_field()
+        name = field.lstrip('-')
+        descending = field.startswith('-')
+        if name == 'pk':
+            model_field = queryset.model._meta.pk
+        else:
+            model_field = queryset.model._meta.get_field(name)
+        after = self.get_cursor('after')
+        before = self.get_cursor('before')
+
+        if before:
+            lookup = 'gt' if descending else 'lt'
+            value = self.decode_cursor(before, model_field)
+            ordering = name if descending else '-%s' % name
+        else:
+            lookup = 'lt' if descending else 'gt'
+            value = self.decode_cursor(after, model_field) if after else None
+            ordering = field
+        if value is not None:
+            queryset = queryset.filter(**{'%s__%s' % (name, lookup): value})
+        queryset = queryset.order_by(ordering)
+
+        # One more row tells if there is a page further
+        object_list = list(queryset[:page_size + 1])
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+        if before:
+            object_list.reverse()
+
+        if not object_list:
+            if not (after or before) and not self.get_allow_empty():
+                raise Http404(_(u"Empty list and '%(class_name)s.allow_empty' is False.")
+                              % {'class_name': self.__class__.__name__})
+            return (object_list, None, None)
+        first = self.encode_cursor(self.get_cursor_value(object_list[0], name))
+        last = self.encode_cursor(self.get_cursor_value(object_list[-1], name))
+        if before:
+            return (object_list, last, first if has_more else None)
+        return (object_list, last if has_more else None, first if after else None)
+
     def get_paginate_by(self, queryset):
         """
         Get the number of items to paginate by, or ``None`` for no pagination.
@@ -61,7 +160,24 @@ class MultipleObjectMixin(ContextMixin):
         """
         Return an instance of the paginator for this view.
         """
-        return self.paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+        paginator = self.paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+        if self.count_strategy != 'exact' and hasattr(queryset, 'query'):
+            paginator._count = self.get_count(queryset)
+        return paginator
+
+    def get_count(self, queryset):
+        """
+        Returns the number of rows according to the count strategy.
+        """
+        strategy = self.count_strategy
+        if callable(strategy):
+            return strategy(queryset)
+        if not strategy in COUNT_STRATEGIES:
+            raise ImproperlyConfigured(u"Unknown count strategy %r for %s"
+                                       % (strategy, self.__class__.__name__))
+        if strategy == 'cached':
+            return COUNT_STRATEGIES[strategy](queryset, self.count_cache_timeout)
+        return COUNT_STRATEGIES[strategy](queryset)
 
     def get_allow_empty(self):
         """
@@ -85,10 +201,22 @@ class MultipleObjectMixin(ContextMixin):
         """
         Get the context for this view.
         """
-        queryset = self.get_queryset()
+        queryset = self.adjust_queryset(self.get_queryset())
         page_size = self.get_paginate_by(queryset)
         context_object_name = self.get_context_object_name(queryset)
-        if page_size:
+        if page_size and self.get_cursor_field():
+            queryset, next_cursor, prev_cursor = \
+                self.paginate_queryset_by_cursor(queryset, page_size)
+            context = {
+                '%s_paginator' % (self.get_object_name(),): None,
+                '%s_page_obj' % (self.get_object_name(),): None,
+                '%s_is_paginated' % (self.get_object_name(),):
+                    bool(next_cursor or prev_cursor),
+                '%s_next_cursor' % (self.get_object_name(),): next_cursor,
+                '%s_prev_cursor' % (self.get_object_name(),): prev_cursor,
+                context_object_name: queryset
+            }
+        elif page_size:
             paginator, page, queryset, is_paginated = self.paginate_queryset(
                 queryset, page_size)
             context = {
@@ -0,0 +1,120 @@
+"""
+Related objects loading.
+
+With DEBUG on, the foreign keys the templates follow without the queryset
+having selected them are reported with a RelatedLoadWarning, as each of
+them costs a query per object.
+"""
+
+import warnings
+
+from django.db.models import ForeignKey
+
+
+class RelatedLoadWarning(RuntimeWarning):
+    pass
+
+
+def get_cached_relations(obj):
+    """
+    Returns the names of the foreign keys whose object is loaded.
+    """
+    return set(field.name for field in obj._meta.fields
+        if isinstance(field, ForeignKey) and
+            hasattr(obj, field.get_cache_name()))
+
+
+def get_selected_relations(queryset):
+    """
+    Returns the names of the relations the queryset selects, or None if it
+    selects them all.
+    """
+    selected = queryset.query.select_related
+    if selected is True:
+        return None
+    return set(selected or ())
+
+
+def get_selected_lookups(selected, prefix=''):
+    """
+    Returns the lookups of a query's select_related dict.
+    """
+    lookups = []
+    for name, children in selected.iteritems():
+        if children:
+            lookups.extend(get_selected_lookups(children,
+                '%s%s__' % (prefix, name)))
+        else:
+            lookups.append(prefix + name)
+    return lookups
+
+
+def merge_select_related(queryset, lookups):
+    """
+    Adds the lookups to the queryset's select_related ones. Django replaces
+    them instead.
+    """
+    selected = queryset.query.select_related
+    if selected is True:
+        # Already follows all the foreign keys
+        return queryset
+    merged = get_selected_lookups(selected or {})
+    merged.extend(lookup for lookup in lookups if not lookup in merged)
+    return queryset.select_related(*merged)
+
+
+class RelatedLoadsChecker(object):
+    """
+    Post render callback warning about the relations loaded by the
+    rendering. objects is a model instance, a list or a queryset.
+    """
+
+    def __init__(self, mixin, objects):
+        self.mixin = mixin
+        self.objects = objects
+        self.queryset = hasattr(objects, 'query')
+        if self.queryset:
+            self.selected = get_selected_relations(objects)
+        else:
+            # Those are already evaluated, remember what they hold
+            self.selected = [get_cached_relations(obj)
+                for obj in self.get_objects()]
+
+    def get_objects(self):
+        if self.queryset:
+            return self.objects._result_cache or []
+        if hasattr(self.objects, '_meta'):
+            return [self.objects]
+        return list(self.objects or [])
+
+    def get_loaded(self):
+        """
+        Returns the names of the relations loaded during the rendering with
+        the number of objects they were loaded for.
+        """
+        if self.selected is None:
+            return {}
+        loaded = {}
+        for i, obj in enumerate(self.get_objects()):
+            if not hasattr(obj, '_meta'):
+                continue
+            if self.queryset:
+                selected = self.selected
+            elif i < len(self.selected):
+                selected = self.selected[i]
+            else:
+                selected = set()
+            for name in get_cached_relations(obj) - selected:
+                loaded[name] = loaded.get(name, 0) + 1
+        return loaded
+
+    def __call__(self, response):
+        loaded = self.get_loaded()
+        if loaded:
+            warnings.warn(u"%s in %s mode loaded %s while rendering, add "
+                u"them to select_related." % (
+                    self.mixin.__class__.__name__, self.mixin.mode,
+                    u', '.join(u'%s (%i times)' % (name, count)
+                        for name, count in sorted(loaded.items()))),
+                RelatedLoadWarning)
+        return response
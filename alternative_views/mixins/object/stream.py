@@ -0,0 +1,156 @@
+"""
+Streaming list mode.
+
+The objects are fetched by chunks of stream_chunk_size rows, each chunk
+seeking the rows after the previous one, and each of them is rendered with
+its own template, so memory use doesn't depend on the number of rows. The
+rows keep the cursor_field order if the mixin has one, else the
+queryset's ordering if it is a single unique field, else the primary key
+order. Querysets ordered on anything else, or sliced, can't be streamed. The templates are found by adding
+_header, _row and _footer to the mode's template names, for example
+local_tests/obj_stream_row.html. Header and footer get the view's context,
+and are optional. The row template also gets the object under the mixin's
+name.
+"""
+
+import os
+
+from django import http
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.fields import FieldDoesNotExist
+from django.template import RequestContext, TemplateDoesNotExist
+from django.template.loader import select_template
+
+from alternative_views.mixins import TEMPLATES, templates_reload
+
+from .list import MultipleObjectMixin
+
+
+STREAM_PARTS = ('header', 'row', 'footer')
+
+
+def get_stream_ordering(queryset, cursor_field=None):
+    """
+    Returns the unique field, prefixed by '-' for a descending order, the
+    queryset's rows are streamed by.
+    """
+    query = queryset.query
+    if query.low_mark or query.high_mark is not None:
+        raise ImproperlyConfigured(u"Sliced querysets can't be streamed")
+    if cursor_field:
+        return cursor_field
+    ordering = query.order_by or query.extra_order_by
+    if not ordering and query.default_ordering:
+        ordering = query.model._meta.ordering
+    if not ordering:
+        return 'pk'
+    if len(ordering) == 1:
+        name = ordering[0].lstrip('-')
+        if name == 'pk':
+            return ordering[0]
+        try:
+            field = query.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            field = None
+        if field is not None and (field.unique and not field.null):
+            return ordering[0]
+    raise ImproperlyConfigured(u"Can't stream rows ordered by %s, order "
+        u"them by a single unique field or set a cursor_field"
+        % ', '.join(ordering))
+
+
+def iterate_by_chunks(queryset, chunk_size, ordering='pk'):
+    """
+    Yields the queryset's objects in the order of the unique field
+    ordering, fetching chunk_size of them per query.
+    """
+    name = ordering.lstrip('-')
+    lookup = 'lt' if ordering.startswith('-') else 'gt'
+    queryset = queryset.order_by(ordering)
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(**{'%s__%s' % (name, lookup): last})
+        objects = list(chunk[:chunk_size])
+        for obj in objects:
+            yield obj
+        if len(objects) < chunk_size:
+            return
+        last = getattr(objects[-1], name)
+
+
+def streaming_response(content, **kwargs):
+    """
+    Returns a response sending the content iterator as it goes.
+    """
+    response_class = getattr(http, 'StreamingHttpResponse', None)
+    if response_class is None:
+        # Before Django 1.5 HttpResponse streams iterators itself
+        response_class = http.HttpResponse
+    return response_class(content, **kwargs)
+
+
+class StreamingListMixin(MultipleObjectMixin):
+    stream_chunk_size = 500
+
+    def get_paginate_by(self, queryset):
+        return None
+
+    def get_stream_template_names(self, part):
+        names = []
+        for name in self.get_template_names():
+            root, ext = os.path.splitext(name)
+            names.append('%s_%s%s' % (root, part, ext))
+        return names
+
+    def get_stream_template(self, part):
+        """
+        Returns the template for the part or None if it has none. Rows
+        need one.
+        """
+        key = None
+        if not templates_reload():
+            key = self.get_template_cache_key()
+        if key is not None:
+            key = (key, part)
+            if key in TEMPLATES:
+                return TEMPLATES[key]
+        try:
+            template = select_template(self.get_stream_template_names(part))
+        except TemplateDoesNotExist:
+            if part == 'row':
+                raise
+            template = None
+        if key is not None:
+            template = TEMPLATES.setdefault(key, template)
+        return template
+
+    def stream(self, request, context, templates, ordering):
+        header, row, footer = templates
+        context = RequestContext(request, context)
+        name = self.get_object_name()
+        if header is not None:
+            yield header.render(context)
+        for obj in iterate_by_chunks(context['%s_list' % name],
+                self.stream_chunk_size, ordering):
+            context.push()
+            context[name] = obj
+            yield row.render(context)
+            context.pop()
+        if footer is not None:
+            yield footer.render(context)
+
+    def render_stream(self, request, context, **response_kwargs):
+        """
+        Returns a response streaming the rendered rows.
+        """
+        # Missing templates and unsupported orderings are reported now
+        # rather than while streaming
+        templates = [self.get_stream_template(part) for part in STREAM_PARTS]
+        ordering = get_stream_ordering(
+            context['%s_list' % self.get_object_name()],
+            self.get_cursor_field())
+        return streaming_response(
+            self.stream(request, context, templates, ordering),
+            **response_kwargs)
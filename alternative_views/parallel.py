@@ -0,0 +1,112 @@
+"""
+Concurrent context building.
+
+Mixins that don't read each other's context can be built at the same time.
+Each pool thread keeps its own database connections from one request to
+the next, and uses the request's language and time zone.
+
+In-memory sqlite databases, like the test ones, only exist for the
+connection that created them: the pool threads share the calling thread's
+connection, as Django's LiveServerTestCase does.
+"""
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from django.db import connections, DatabaseError
+from django.utils import timezone, translation
+
+
+# Process wide thread pools, keyed on their number of threads
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def get_pool(workers):
+    """
+    Returns the pool of the given size, created on first use.
+    """
+    try:
+        return POOLS[workers]
+    except KeyError:
+        pass
+    POOLS_LOCK.acquire()
+    try:
+        if not workers in POOLS:
+            POOLS[workers] = ThreadPool(workers)
+        return POOLS[workers]
+    finally:
+        POOLS_LOCK.release()
+
+
+def close_pools():
+    """
+    Waits for the pools' threads and discards the pools.
+    """
+    POOLS_LOCK.acquire()
+    try:
+        for pool in POOLS.values():
+            pool.close()
+            pool.join()
+        POOLS.clear()
+    finally:
+        POOLS_LOCK.release()
+
+
+def close_connections():
+    for connection in connections.all():
+        connection.close()
+
+
+def release_connections():
+    """
+    Ends the transactions the thread's connections opened, keeping the
+    connections for its next tasks. Broken ones are closed.
+    """
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        try:
+            connection._rollback()
+        except DatabaseError:
+            connection.close()
+
+
+def get_shared_connections():
+    """
+    Returns the calling thread's connections to in-memory sqlite databases.
+    """
+    shared = []
+    for connection in connections.all():
+        if connection.vendor == 'sqlite' and \
+                connection.settings_dict['NAME'] in ('', ':memory:'):
+            connection.allow_thread_sharing = True
+            shared.append(connection)
+    return shared
+
+
+def run_concurrently(workers, func, items):
+    """
+    Returns [func(item) for item in items], the calls being made in the
+    pool's threads. The first exception raised by a call is raised again.
+    """
+    language = translation.get_language()
+    current_timezone = timezone.get_current_timezone()
+    shared = get_shared_connections()
+
+    def call(item):
+        translation.activate(language)
+        timezone.activate(current_timezone)
+        for connection in shared:
+            connections[connection.alias] = connection
+        try:
+            return func(item)
+        finally:
+            translation.deactivate()
+            timezone.deactivate()
+            # The shared connections belong to the calling thread
+            for connection in shared:
+                delattr(connections._connections, connection.alias)
+            release_connections()
+    return get_pool(workers).map(call, items)
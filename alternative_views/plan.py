@@ -0,0 +1,184 @@
+"""
+Dispatch plans.
+
+Everything a View does that doesn't depend on the request - the mixins
+order, their resolved mode and which mixin handles each HTTP method - is
+computed once per view class and mode and stored in a DispatchPlan.
+"""
+
+from collections import namedtuple
+
+from alternative_views.cache import watch_models, watch_objects
+from alternative_views.mixins import Mixin
+from alternative_views.mixins.object.joins import find_lookup_chain
+
+
+# lazy_names: the context names of a lazy mixin, None if it is evaluated
+# when the view processes the request
+# authorization: True if the mixin has an authorization method
+MixinSpec = namedtuple('MixinSpec',
+    'name mode mixin lazy_names authorization')
+
+
+class DispatchPlan(namedtuple('DispatchPlan',
+        'mode mixins handlers allowed_methods dynamic lookup_chain lazy '
+        'models')):
+    """
+    Read only description of how a view processes the requests for a mode.
+
+    - mixins: MixinSpec tuples in the declaration order. The mixin is a
+      prototype already specialised for the mode.
+    - handlers: (method, mixin name) pairs.
+    - allowed_methods: the methods some mixin can process.
+    - dynamic: True if a mixin overrides can_process in which case the
+      handler has to be looked up for each request.
+    - lookup_chain: detail mixins whose objects are fetched with a single
+      query (see alternative_views.mixins.object.joins) or None.
+    - lazy: True if a mixin's context is lazily evaluated.
+    - models: the models the mixins use.
+    """
+    __slots__ = ()
+
+    def get_handler_name(self, method):
+        """
+        Returns the name of the mixin processing the method or None.
+        """
+        for handler_method, name in self.handlers:
+            if handler_method == method:
+                return name
+        return None
+
+
+def resolve_modes(view_class, mode):
+    """
+    Returns the (name, mixin, mode) for the view's mixins.
+    Mode order: mixin's, default's (if not last), view's
+    """
+    items = view_class.base_mixins.items()
+    last = len(items) - 1
+    result = []
+    for i, (name, mixin) in enumerate(items):
+        default_mode = mixin.default_mode if i != last else None
+        result.append((name, mixin, mixin.mode or default_mode or mode))
+    return result
+
+
+def has_authorization(mixin):
+    """
+    Returns True if the mixin may refuse a request.
+    """
+    return mixin.has_authorization()
+
+
+def get_lazy_names(mixin):
+    """
+    Returns the context names of a mixin that can be lazily evaluated.
+    """
+    if not mixin.lazy:
+        return None
+    # Authorizations have to be known when the view processes the request
+    if has_authorization(mixin):
+        return None
+    names = mixin.get_context_names()
+    return names and tuple(names) or None
+
+
+def get_mixin_model(mixin):
+    """
+    Returns the model the mixin declares or None.
+    """
+    model = getattr(mixin, 'model', None)
+    if not hasattr(model, '_meta'):
+        model = getattr(getattr(mixin, 'queryset', None), 'model', None)
+    return model
+
+
+def get_models(specs):
+    """
+    Returns the models of the mixins.
+    """
+    models = []
+    for spec in specs:
+        model = get_mixin_model(spec.mixin)
+        if model is not None and not model in models:
+            models.append(model)
+    return models
+
+
+def get_waves(specs, dependencies):
+    """
+    Groups the specs in lists whose mixins only depend on the previous
+    lists' ones or on mixins out of specs.
+    """
+    levels = {}
+    waves = []
+    for spec in specs:
+        level = 0
+        for name in dependencies[spec.name]:
+            if name in levels:
+                level = max(level, levels[name] + 1)
+        levels[spec.name] = level
+        if level == len(waves):
+            waves.append([])
+        waves[level].append(spec)
+    return waves
+
+
+def compile_plan(view_class, mode, join_parent_lookups=None):
+    """
+    Builds the DispatchPlan of view_class for the given mode.
+    """
+    if join_parent_lookups is None:
+        join_parent_lookups = view_class.join_parent_lookups
+    specs = []
+    dynamic = False
+    for name, mixin, mixin_mode in resolve_modes(view_class, mode):
+        prototype = mixin.clone()
+        # TODO: don't push names like this !
+        prototype.context_object_name = name
+        prototype.as_mode(mixin_mode)
+        specs.append(MixinSpec(name, mixin_mode, prototype,
+            get_lazy_names(prototype), has_authorization(prototype)))
+        can_process = getattr(type(prototype).can_process, 'im_func', None)
+        if can_process is not Mixin.can_process.im_func:
+            dynamic = True
+
+    # Search order is reversed as we expect latest mixins to be more
+    # specialized than the firsts.
+    handlers = []
+    for method in view_class.http_method_names:
+        for spec in reversed(specs):
+            if spec.mixin.can_process_method(method):
+                handlers.append((method, spec.name))
+                break
+
+    lookup_chain = None
+    if join_parent_lookups:
+        lookup_chain = find_lookup_chain(specs)
+
+    plan = DispatchPlan(
+        mode=mode,
+        mixins=tuple(specs),
+        handlers=tuple(handlers),
+        allowed_methods=tuple(method for method, name in handlers),
+        dynamic=dynamic,
+        lookup_chain=lookup_chain,
+        lazy=any(spec.lazy_names for spec in specs),
+        models=tuple(get_models(specs)),
+    )
+    watch_plan(plan, view_class.cache_timeout, view_class.cache_alias)
+    return plan
+
+
+def watch_plan(plan, cache_timeout, cache_alias):
+    """
+    Connects the receivers evicting the cached responses and objects of the
+    plan's mixins, before the view processes any request.
+    """
+    if cache_timeout:
+        watch_models(plan.models, cache_alias)
+    for spec in plan.mixins:
+        model = get_mixin_model(spec.mixin)
+        if model is not None and \
+                getattr(spec.mixin, 'object_cache_timeout', None):
+            watch_objects(model, spec.mixin.object_cache_alias)
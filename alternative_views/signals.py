@@ -0,0 +1,13 @@
+"""
+Signals sent by the views.
+"""
+
+from django.dispatch import Signal
+
+
+# Sent by instrumented views once the handler returned a response, rendered
+# under the handler's 'render' phase. timings is a list of MixinTiming,
+# handler the name of the processing mixin (None if no mixin could process
+# the request).
+view_instrumented = Signal(providing_args=['view', 'request', 'response',
+    'timings', 'handler'])
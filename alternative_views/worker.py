@@ -0,0 +1,57 @@
+"""
+Local background worker.
+
+Runs the tasks the views hand over, like large deletions, in a single
+thread of the process so the response doesn't wait for them. Tasks are lost
+if the process stops before running them.
+"""
+
+import Queue
+import threading
+
+from django.utils.log import getLogger
+
+from alternative_views.parallel import close_connections
+
+
+logger = getLogger('alternative_views.worker')
+
+TASKS = Queue.Queue()
+WORKER = []
+WORKER_LOCK = threading.Lock()
+
+
+def work():
+    while True:
+        func, args, kwargs = TASKS.get()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception('Background task %r failed', func)
+        finally:
+            close_connections()
+            TASKS.task_done()
+
+
+def submit(func, *args, **kwargs):
+    """
+    Queues func(*args, **kwargs), starting the worker thread if needed.
+    """
+    WORKER_LOCK.acquire()
+    try:
+        if not WORKER:
+            thread = threading.Thread(target=work,
+                name='alternative_views.worker')
+            thread.daemon = True
+            thread.start()
+            WORKER.append(thread)
+    finally:
+        WORKER_LOCK.release()
+    TASKS.put((func, args, kwargs))
+
+
+def join():
+    """
+    Waits until the queued tasks are done.
+    """
+    TASKS.join()
@@ -0,0 +1,5 @@
+"""
+Micro benchmarks for the views' request processing.
+
+Run them with ``python runbenchmarks.py``.
+"""
@@ -0,0 +1,21 @@
+"""
+Cost of building a view instance for a request, according to the number
+of mixins.
+"""
+
+from .utils import SIZES, make_view, measure
+
+
+def run(sizes=SIZES, modes=('detail',), number=100):
+    results = []
+    for mode in modes:
+        for size in sizes:
+            view_class = make_view(size)
+            view_class.get_plan(mode)
+            results.append({
+                'mixins': size,
+                'mode': mode,
+                'construction': measure(lambda: view_class(mode=mode),
+                    number=number),
+            })
+    return results
@@ -0,0 +1,64 @@
+"""
+Cost of building the context according to the number of mixins and the
+number of context entries each of them adds. Each mixin reads the previous
+one's entry, as nested mixins do.
+
+With a linear context building, time per mixin stays flat when the number
+of mixins grows.
+"""
+
+from alternative_views.base import ViewMetaclass, View
+from alternative_views.mixins import Mixin
+
+from .utils import measure, get_request
+
+
+SIZES = (1, 5, 10, 25, 50, 100)
+KEYS = (1, 20)
+
+
+class WideMixin(Mixin):
+    keys = 1
+    previous = None
+
+    def get_context(self, request, context, permissions=None, **kwargs):
+        if self.previous:
+            getattr(self, self.previous)
+        for i in range(self.keys):
+            context['%s_%i' % (self.context_object_name, i)] = i
+        context[self.context_object_name] = self
+        return context
+
+
+def make_view(size, keys):
+    attrs = {}
+    previous = None
+    for i in range(size):
+        name = 'mixin%i' % i
+        attrs[name] = type('WideMixin%i' % i, (WideMixin,),
+            {'keys': keys, 'previous': previous})()
+        previous = name
+    return ViewMetaclass('WideView%i' % size, (View,), attrs)
+
+
+def build_context(view_class, request):
+    view = view_class(mode='detail')
+    view.build_context(view.plan.mixins, request, {}, {}, None)
+    return view.context
+
+
+def run(sizes=SIZES, keys=KEYS, number=100):
+    request, kwargs = get_request('list')
+    results = []
+    for key_count in keys:
+        for size in sizes:
+            view_class = make_view(size, key_count)
+            context = measure(lambda: build_context(view_class, request),
+                number=number)
+            results.append({
+                'mixins': size,
+                'keys': key_count,
+                'context': context,
+                'per_mixin': context / size,
+            })
+    return results
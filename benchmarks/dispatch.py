@@ -0,0 +1,53 @@
+"""
+Cost of the request processing steps according to the number of mixins
+and the mode:
+
+- context: the mixins' get_context calls,
+- dispatch: View.dispatch, which includes the context and the response
+  creation,
+- render: the response rendering.
+"""
+
+from .utils import SIZES, MODES, make_view, get_request, measure
+
+
+def build_context(view_class, mode, request, kwargs):
+    view = view_class(mode=mode)
+    for mixin in view.mixins.values():
+        mixin.kwargs.update(kwargs)
+        view.context = mixin.get_context(request, view.context,
+            permissions={}, **kwargs)
+    return view.context
+
+
+def render_response(response):
+    """
+    Renders the response, streamed ones being consumed.
+    """
+    if hasattr(response, 'render'):
+        return response.render()
+    return ''.join(response)
+
+
+def run(sizes=SIZES, modes=MODES, number=100):
+    results = []
+    for mode in modes:
+        request, kwargs = get_request(mode)
+        for size in sizes:
+            view_class = make_view(size)
+            view = view_class.as_view(mode=mode)
+            context = measure(
+                lambda: build_context(view_class, mode, request, kwargs),
+                number=number)
+            dispatch = measure(lambda: view(request, **kwargs),
+                number=number)
+            render = measure(lambda: render_response(view(request, **kwargs)),
+                number=number)
+            results.append({
+                'mixins': size,
+                'mode': mode,
+                'context': context,
+                'dispatch': dispatch,
+                'render': max(render - dispatch, 0),
+            })
+    return results
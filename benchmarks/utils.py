@@ -0,0 +1,67 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import timeit
+
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from alternative_views.base import ViewMetaclass, View
+from alternative_views.mixins.object import ObjectMixin
+
+from local_tests.models import MyObjectModel
+
+
+SIZES = (1, 5, 10, 25, 50)
+MODES = sorted(ObjectMixin.HERITAGE_PER_MODE.keys())
+OBJECTS = 20
+
+
+class BenchMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name_prefix = 'local_tests/obj'
+    json_fields = ('id', 'slug')
+
+
+def make_view(size, mixin_class=BenchMixin, **mixin_kwargs):
+    """
+    Returns a View subclass with size mixins. The last one follows the
+    view's mode, the others are in list mode unless mixin_kwargs says
+    otherwise.
+    """
+    attrs = {}
+    for i in range(size - 1):
+        kwargs = dict(mode='list')
+        kwargs.update(mixin_kwargs)
+        attrs['mixin%i' % i] = mixin_class(**kwargs)
+    attrs['obj'] = mixin_class()
+    return ViewMetaclass('BenchView%i' % size, (View,), attrs)
+
+
+def setup_database():
+    """
+    Creates the tables and some objects in the (in memory) database.
+    """
+    call_command('syncdb', interactive=False, verbosity=0)
+    MyObjectModel.objects.all().delete()
+    for i in range(OBJECTS):
+        MyObjectModel.objects.create(slug='obj%i' % i)
+
+
+def get_request(mode):
+    """
+    Returns a GET request and the URL kwargs for the mode.
+    """
+    kwargs = {}
+    if mode not in ('list', 'new'):
+        kwargs['pk'] = MyObjectModel.objects.all()[0].pk
+    return RequestFactory().get('/'), kwargs
+
+
+def measure(func, number=100, repeat=3):
+    """
+    Returns the best time of a call to func, in seconds.
+    """
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
@@ -11,17 +11,18 @@ from django.core.urlresolvers import reverse
 class ProjectMixin(ObjectMixin):
     model = Project
     pk_url_kwarg = 'project_id'
+    # Users only see the projects they are members of
+    authorization_filter = {'members': lambda request: request.user.id}
 
     def get_success_url(self):
         return reverse('projects')
 
-    def get_queryset(self):
-        return Project.objects.filter(members=self.request.user.id)
-
 
 class MilestoneMixin(ObjectMixin):
     model = Milestone
     pk_url_kwarg = 'milestone_id'
+    requires = ('project',)
+    join_lookups = ('project',)
 
     def get_success_url(self):
         return reverse('milestones')
@@ -33,6 +34,9 @@ class MilestoneMixin(ObjectMixin):
 class BugMixin(ObjectMixin):
     model = Bug
     pk_url_kwarg = 'bug_id'
+    requires = ('project', 'milestone')
+    join_lookups = ('project', 'milestone')
+    select_related = {'list': ('project', 'milestone')}
 
     def get_success_url(self):
         return reverse('bugs', kwargs={'project_id': self.project.id})
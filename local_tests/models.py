@@ -1,7 +1,14 @@
+import os
+import tempfile
 
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 
 
+storage = FileSystemStorage(
+    location=os.path.join(tempfile.gettempdir(), 'alternative_views_tests'))
+
+
 class MyObjectModel(models.Model):
     slug = models.CharField(max_length=8)
 
@@ -22,3 +29,27 @@ class MyOtherObjectModel(models.Model):
 
     def __unicode__(self):
         return u'%i' % (self.id,)
+
+
+class MyChildObjectModel(models.Model):
+    parent = models.ForeignKey(MyObjectModel, related_name='children')
+    other = models.ForeignKey(MyOtherObjectModel, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __unicode__(self):
+        return u'%i' % (self.id,)
+
+
+class MyDocumentModel(models.Model):
+    parent = models.ForeignKey(MyObjectModel, related_name='documents')
+    attachment = models.FileField(upload_to='documents', storage=storage,
+        blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __unicode__(self):
+        return u'%i' % (self.id,)
@@ -3,8 +3,35 @@
 """
 
 from base_mixin import TestMixins, TestView
-from authorizations import TestAuthorization
-from view import TestViewResponse, TestMixinMode
+from authorizations import TestAuthorization, TestAuthorizationFilter
+from view import TestViewResponse, TestMixinMode, TestDispatchPlan
 
-from object_view import TestObjectMixin, TestObjectListMixin
+from object_view import TestObjectMixin, TestObjectListMixin, TestFormClasses
+from object_view import TestTemplateCache, TestProjections
 from object_view import TestObjectMixinIntegrationWithView
+
+from joins import TestLookupChain
+
+from pagination import TestCursorPagination, TestCountStrategies
+
+from instrumentation import TestInstrumentation
+
+from lazy import TestLazyMixins
+
+from dispatch import TestHandlerFirst, TestContextNamespace
+
+from conditional import TestConditionalGet
+
+from cache import TestResponseCache, TestCachedResponse, TestObjectCache
+
+from parallel import TestDependencies, TestParallelContext
+
+from stream import TestStreamMode
+
+from api import TestJSONModes
+
+from related import TestRelatedOptions
+
+from bulk import TestBulkModes
+
+from delete import TestDeleteModes
@@ -0,0 +1,142 @@
+"""
+Tests the JSON modes.
+"""
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import TestCase
+from django.utils import simplejson
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyChildObjectModel
+
+
+class JSONObjectMixin(ObjectMixin):
+    model = MyObjectModel
+    json_fields = ('id', 'slug')
+    paginate_by = 2
+
+
+class JSONCursorMixin(JSONObjectMixin):
+    json_fields = ('slug',)
+    cursor_field = 'id'
+
+
+class JSONChildMixin(ObjectMixin):
+    model = MyChildObjectModel
+    json_fields = ('id', 'parent', 'updated_at')
+
+
+class NoFieldsMixin(ObjectMixin):
+    model = MyObjectModel
+
+
+class FilteredJSONMixin(JSONObjectMixin):
+    authorization_filter = {'slug': 'obj0'}
+
+
+class CachedJSONMixin(JSONObjectMixin):
+    object_cache_timeout = 60
+
+
+class JSONView(View):
+    obj = JSONObjectMixin()
+
+
+class JSONCursorView(View):
+    obj = JSONCursorMixin()
+
+
+class JSONChildView(View):
+    child = JSONChildMixin()
+
+
+class NoFieldsView(View):
+    obj = NoFieldsMixin()
+
+
+class FilteredJSONView(View):
+    obj = FilteredJSONMixin()
+
+
+class CachedJSONView(View):
+    obj = CachedJSONMixin()
+
+
+class TestJSONModes(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.objects = [MyObjectModel.objects.create(slug='obj%i' % i)
+            for i in range(3)]
+        self.rf = RequestFactory()
+
+    def get(self, view_class, mode, data=None, **kwargs):
+        response = view_class.as_view(mode=mode)(
+            self.rf.get('/', data or {}), **kwargs)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return simplejson.loads(response.content)
+
+    def test_list(self):
+        with self.assertNumQueries(2):
+            data = self.get(JSONView, 'json_list')
+        self.assertEqual(data, {
+            'objects': [
+                {'id': self.objects[0].id, 'slug': 'obj0'},
+                {'id': self.objects[1].id, 'slug': 'obj1'},
+            ],
+            'count': 3,
+            'num_pages': 2,
+            'page': 1,
+        })
+        data = self.get(JSONView, 'json_list', {'page': 2})
+        self.assertEqual(data['objects'],
+            [{'id': self.objects[2].id, 'slug': 'obj2'}])
+
+    def test_cursor(self):
+        data = self.get(JSONCursorView, 'json_list')
+        self.assertEqual([obj['slug'] for obj in data['objects']],
+            ['obj0', 'obj1'])
+        data = self.get(JSONCursorView, 'json_list',
+            {'after': data['next_cursor']})
+        self.assertEqual([obj['slug'] for obj in data['objects']],
+            ['obj2'])
+        self.assertEqual(data['next_cursor'], None)
+
+    def test_detail(self):
+        with self.assertNumQueries(1):
+            data = self.get(JSONView, 'json_detail', pk=self.objects[1].id)
+        self.assertEqual(data, {'id': self.objects[1].id, 'slug': 'obj1'})
+        self.assertRaises(Http404, self.get, JSONView, 'json_detail',
+            pk=0)
+
+    def test_object_cache(self):
+        # The values() rows are read from the database every time
+        for i in range(2):
+            with self.assertNumQueries(1):
+                data = self.get(CachedJSONView, 'json_detail',
+                    pk=self.objects[1].id)
+            self.assertEqual(data, {'id': self.objects[1].id, 'slug': 'obj1'})
+
+    def test_declared_fields(self):
+        child = MyChildObjectModel.objects.create(parent=self.objects[0])
+        data = self.get(JSONChildView, 'json_detail', pk=child.id)
+        self.assertEqual(sorted(data.keys()), ['id', 'parent', 'updated_at'])
+        self.assertEqual(data['parent'], self.objects[0].id)
+        self.assertTrue(data['updated_at'])
+
+    def test_fields_are_required(self):
+        for mode in ('json_list', 'json_detail'):
+            self.assertRaises(ImproperlyConfigured, self.get, NoFieldsView,
+                mode, pk=self.objects[0].id)
+
+    def test_authorization(self):
+        data = self.get(FilteredJSONView, 'json_list')
+        self.assertEqual([obj['slug'] for obj in data['objects']], ['obj0'])
+        self.assertEqual(data['count'], 1)
+        self.assertRaises(PermissionDenied, self.get, FilteredJSONView,
+            'json_detail', pk=self.objects[1].id)
@@ -8,9 +8,14 @@ from  django.core.exceptions import PermissionDenied
 from django.test import RequestFactory
 from django.test import TestCase
 
+from django.db.models import Q
+
 from alternative_views.mixins import Mixin
+from alternative_views.mixins.object import ObjectMixin
 from alternative_views.base import View
 
+from ..models import MyObjectModel
+
 
 class MyMixin1(Mixin):
     allowed_methods = ['get']
@@ -83,3 +88,69 @@ class TestAuthorization(TestCase):
         view.mixins['permission'].RESPONSE_CODE = None
         with self.assertRaises(PermissionDenied):
             view.dispatch(request)
+
+
+
+class FilteredMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/obj_list.html'
+    authorization_filter = {'slug': lambda request: request.GET.get('user')}
+    paginate_by = 10
+
+
+class QFilteredMixin(FilteredMixin):
+    authorization_filter = Q(slug='other')
+
+
+class FilteredView(View):
+    obj = FilteredMixin()
+
+
+class QFilteredView(View):
+    obj = QFilteredMixin()
+
+
+class TestAuthorizationFilter(TestCase):
+
+    def setUp(self):
+        self.mine = MyObjectModel.objects.create(slug='me')
+        self.other = MyObjectModel.objects.create(slug='other')
+        self.rf = RequestFactory()
+
+    def get(self, mode, view_class=FilteredView, **kwargs):
+        view = view_class.as_view(mode=mode)
+        return view(self.rf.get('/', {'user': 'me'}), **kwargs)
+
+    def test_list_is_filtered(self):
+        response = self.get('list')
+        self.assertEqual(list(response.context_data['obj_list']),
+            [self.mine])
+        self.assertEqual(response.context_data['obj_paginator'].count, 1)
+
+    def test_detail_allowed(self):
+        # The existence check and the object
+        with self.assertNumQueries(2):
+            response = self.get('detail', pk=self.mine.id)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_denied(self):
+        with self.assertNumQueries(1):
+            self.assertRaises(PermissionDenied, self.get, 'detail',
+                pk=self.other.id)
+
+    def test_update_denied(self):
+        self.assertRaises(PermissionDenied, self.get, 'update',
+            pk=self.other.id)
+
+    def test_q_object(self):
+        self.assertRaises(PermissionDenied, self.get, 'detail',
+            view_class=QFilteredView, pk=self.mine.id)
+        response = self.get('list', view_class=QFilteredView)
+        self.assertEqual(list(response.context_data['obj_list']),
+            [self.other])
+
+    def test_only_filtered_modes_authorize(self):
+        plan = FilteredView.get_plan('detail')
+        self.assertTrue(plan.mixins[0].authorization)
+        plan = FilteredView.get_plan('list')
+        self.assertFalse(plan.mixins[0].authorization)
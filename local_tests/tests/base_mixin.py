@@ -39,6 +39,26 @@ class TestMixins(TestCase):
         self.assertEqual(mixin1.creation_counter + 1, mixin2.creation_counter)
         self.assertEqual(mixin2.creation_counter + 1, mixin1b.creation_counter)
 
+    def test_clone_shares_the_configuration(self):
+        mixin = MyMixin1(mode='list')
+        mixin.queryset = []
+        clone = mixin.clone()
+        self.assertFalse(clone is mixin)
+        self.assertEqual(clone.__class__, MyMixin1)
+        self.assertEqual(clone.mode, 'list')
+        self.assertEqual(clone.creation_counter, mixin.creation_counter)
+        self.assertTrue(clone.queryset is mixin.queryset)
+
+    def test_clone_copies_the_request_state(self):
+        class StateMixin(Mixin):
+            request_state = ('data',)
+            data = {'key': 'value'}
+        mixin = StateMixin()
+        clone = mixin.clone()
+        self.assertEqual(clone.data, {'key': 'value'})
+        clone.data['key'] = 'other'
+        self.assertEqual(mixin.data, {'key': 'value'})
+
 
 class TestView(TestCase):
 
@@ -50,6 +70,15 @@ class TestView(TestCase):
         self.assertEqual(MyView1.base_mixins.keys(), ['mixin1', 'mixin2'])
         self.assertEqual(MyView2.base_mixins.keys(), ['mixin2', 'mixin1'])
 
+    def test_views_do_not_share_mixins(self):
+        view1 = MyView1(mode='detail')
+        view2 = MyView1(mode='detail')
+        self.assertFalse(view1.mixins['mixin1'] is view2.mixins['mixin1'])
+        self.assertFalse(view1.mixins['mixin1'].kwargs is
+            view2.mixins['mixin1'].kwargs)
+        view1.mixins['mixin1'].kwargs['pk'] = 1
+        self.assertFalse('pk' in view2.mixins['mixin1'].kwargs)
+
     def test_view_keep_mixins_ordered_when_subclassed(self):
         self.assertEqual(
             MySubView.base_mixins.keys(),
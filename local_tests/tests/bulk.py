@@ -0,0 +1,230 @@
+"""
+Tests the bulk creation and update modes.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.forms import ModelForm
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.cache import (get_model_versions, invalidate,
+    watch_models)
+from alternative_views.mixins.object import ObjectMixin
+from alternative_views.mixins.object.bulk import get_modelformset_class
+
+from ..models import (MyObjectModel, MyOtherObjectModel, MyChildObjectModel,
+    MyDocumentModel)
+
+
+class ParentMixin(ObjectMixin):
+    model = MyObjectModel
+    pk_url_kwarg = 'parent_id'
+
+
+class ChildMixin(ObjectMixin):
+    model = MyChildObjectModel
+    template_name_prefix = 'local_tests/child'
+    success_url = '/done/'
+    requires = ('parent',)
+
+    def get_queryset(self):
+        return MyChildObjectModel.objects.filter(parent=self.parent)
+
+
+class ChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    child = ChildMixin()
+
+
+class DocumentMixin(ChildMixin):
+    model = MyDocumentModel
+
+    def get_queryset(self):
+        return MyDocumentModel.objects.filter(parent=self.parent)
+
+
+class DocumentView(View):
+    parent = ParentMixin(default_mode='detail')
+    document = DocumentMixin()
+
+
+class TestBulkModes(TestCase):
+
+    def setUp(self):
+        self.parent = MyObjectModel.objects.create(slug='parent')
+        self.other_parent = MyObjectModel.objects.create(slug='other')
+        self.others = [MyOtherObjectModel.objects.create() for i in range(2)]
+        self.rf = RequestFactory()
+
+    def post(self, mode, data):
+        view = ChildView.as_view(mode=mode)
+        return view(self.rf.post('/', data), parent_id=self.parent.id)
+
+    def count_queries(self, func, *args):
+        """
+        Returns the func's result and the number of queries per type.
+        """
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+        try:
+            result = func(*args)
+        finally:
+            connection.use_debug_cursor = None
+        counts = {}
+        for query in connection.queries[start:]:
+            kind = query['sql'].split()[0]
+            counts[kind] = counts.get(kind, 0) + 1
+        return result, counts
+
+    def test_get(self):
+        MyChildObjectModel.objects.create(parent=self.parent)
+        MyChildObjectModel.objects.create(parent=self.other_parent)
+        view = ChildView.as_view(mode='bulk_update')
+        response = view(self.rf.get('/'), parent_id=self.parent.id)
+        formset = response.context_data['child_formset']
+        # One object of the parent and an extra form
+        self.assertEqual(len(formset.forms), 2)
+        self.assertFalse('parent' in formset.forms[0].fields)
+
+    def test_bulk_new(self):
+        data = {
+            'child-TOTAL_FORMS': '3',
+            'child-INITIAL_FORMS': '0',
+            'child-0-other': self.others[0].id,
+            'child-1-other': self.others[1].id,
+            'child-2-other': '',
+        }
+        response, counts = self.count_queries(self.post, 'bulk_new', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(counts['INSERT'], 1)
+        children = MyChildObjectModel.objects.all()
+        self.assertEqual([(child.parent, child.other) for child in children],
+            [(self.parent, self.others[0]), (self.parent, self.others[1])])
+
+    def test_invalid(self):
+        data = {
+            'child-TOTAL_FORMS': '1',
+            'child-INITIAL_FORMS': '0',
+            'child-0-other': '0',
+        }
+        response = self.post('bulk_new', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context_data['child_formset'].errors)
+        self.assertEqual(MyChildObjectModel.objects.count(), 0)
+
+    def test_bulk_update(self):
+        children = [MyChildObjectModel.objects.create(parent=self.parent)
+            for i in range(3)]
+        data = {
+            'child-TOTAL_FORMS': '3',
+            'child-INITIAL_FORMS': '3',
+            'child-0-id': children[0].id,
+            'child-0-other': self.others[0].id,
+            'child-1-id': children[1].id,
+            'child-1-other': '',
+            'child-2-id': children[2].id,
+            'child-2-other': self.others[0].id,
+        }
+        response, counts = self.count_queries(self.post, 'bulk_update', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(counts['UPDATE'], 1)
+        self.assertEqual(
+            [child.other for child in MyChildObjectModel.objects.all()],
+            [self.others[0], None, self.others[0]])
+
+    def test_bulk_update_out_of_queryset(self):
+        MyChildObjectModel.objects.create(parent=self.parent)
+        child = MyChildObjectModel.objects.create(parent=self.other_parent)
+        for count in ('1', '2'):
+            data = {
+                'child-TOTAL_FORMS': count,
+                'child-INITIAL_FORMS': count,
+                'child-0-id': child.id,
+                'child-0-other': self.others[0].id,
+            }
+            response = self.post('bulk_update', data)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context_data['child_formset'].errors)
+            self.assertEqual(
+                [obj.other for obj in MyChildObjectModel.objects.all()],
+                [None, None])
+
+    def bulk_update_selects(self, count):
+        children = [MyChildObjectModel.objects.create(parent=self.parent)
+            for i in range(count)]
+        data = {
+            'child-TOTAL_FORMS': str(count),
+            'child-INITIAL_FORMS': str(count),
+        }
+        for i, child in enumerate(children):
+            data['child-%i-id' % i] = child.id
+            data['child-%i-other' % i] = self.others[i % 2].id
+        response, counts = self.count_queries(self.post, 'bulk_update', data)
+        self.assertEqual(response.status_code, 302)
+        return counts['SELECT']
+
+    def test_bulk_update_selects(self):
+        # The choices are validated with a query per field, not per form
+        self.assertEqual(self.bulk_update_selects(3),
+            self.bulk_update_selects(6))
+
+    def test_bulk_update_auto_now(self):
+        children = [MyChildObjectModel.objects.create(parent=self.parent)
+            for i in range(3)]
+        past = datetime.datetime(2000, 1, 1)
+        MyChildObjectModel.objects.update(updated_at=past)
+        data = {
+            'child-TOTAL_FORMS': '3',
+            'child-INITIAL_FORMS': '3',
+            'child-0-id': children[0].id,
+            'child-0-other': self.others[0].id,
+            'child-1-id': children[1].id,
+            'child-1-other': '',
+            'child-2-id': children[2].id,
+            'child-2-other': self.others[1].id,
+        }
+        response, counts = self.count_queries(self.post, 'bulk_update', data)
+        self.assertEqual(counts['UPDATE'], 2)
+        dates = [child.updated_at
+            for child in MyChildObjectModel.objects.all()]
+        self.assertTrue(dates[0] > past)
+        self.assertEqual(dates[0], dates[2])
+        self.assertEqual(dates[1], past)
+
+    def test_bulk_update_files(self):
+        document = MyDocumentModel.objects.create(parent=self.parent)
+        data = {
+            'document-TOTAL_FORMS': '1',
+            'document-INITIAL_FORMS': '1',
+            'document-0-id': document.id,
+            'document-0-attachment': SimpleUploadedFile('notes.txt',
+                'content'),
+        }
+        view = DocumentView.as_view(mode='bulk_update')
+        response = view(self.rf.post('/', data), parent_id=self.parent.id)
+        self.assertEqual(response.status_code, 302)
+        attachment = MyDocumentModel.objects.get().attachment
+        self.assertTrue(attachment.name.startswith('documents/notes'))
+        try:
+            self.assertEqual(attachment.read(), 'content')
+        finally:
+            attachment.delete(save=False)
+
+    def test_empty_options(self):
+        default = get_modelformset_class(MyChildObjectModel, ModelForm)
+        no_fields = get_modelformset_class(MyChildObjectModel, ModelForm,
+            fields=())
+        self.assertFalse(no_fields is default)
+        self.assertEqual(no_fields.form.base_fields.keys(), [])
+
+    def test_invalidate(self):
+        watch_models([MyChildObjectModel], 'default')
+        version = get_model_versions(cache, [MyChildObjectModel])
+        invalidate(MyChildObjectModel)
+        self.assertNotEqual(
+            get_model_versions(cache, [MyChildObjectModel]), version)
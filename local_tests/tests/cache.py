@@ -0,0 +1,302 @@
+"""
+Tests the response and object caches.
+"""
+
+import time
+
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.cache import (cached_response, freeze_response,
+    get_model_versions, get_version_key, is_watching_objects)
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyOtherObjectModel
+
+
+class CachedMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/obj_detail.html'
+    paginate_by = 1
+
+
+class CachedView(View):
+    obj = CachedMixin()
+    cache_timeout = 60
+
+
+class OtherMixin(ObjectMixin):
+    model = MyOtherObjectModel
+    template_name = 'local_tests/obj_detail.html'
+
+
+class OtherView(View):
+    other = OtherMixin()
+
+
+class GroupMixin(ObjectMixin):
+    model = Group
+    template_name = 'local_tests/obj_detail.html'
+    authorization_filter = {'user': lambda request: request.user.id}
+
+
+class GroupView(View):
+    group = GroupMixin()
+    cache_timeout = 60
+
+
+class FormMixin(CachedMixin):
+    template_name = 'local_tests/csrf_form.html'
+
+
+class FormView(View):
+    obj = FormMixin()
+    cache_timeout = 60
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.obj = MyObjectModel.objects.create(slug='first')
+        self.rf = RequestFactory()
+
+    def get(self, mode='detail', data=None, **kwargs):
+        view = CachedView.as_view(mode=mode)
+        if mode == 'detail':
+            kwargs.setdefault('pk', self.obj.id)
+        return view(self.rf.get('/', data or {}), **kwargs)
+
+    def test_second_request_is_cached(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.get()
+        self.assertEqual(second.content, first.content)
+
+    def test_save_evicts(self):
+        self.get()
+        self.obj.slug = 'changed'
+        self.obj.save()
+        with self.assertNumQueries(1):
+            self.get()
+
+    def test_save_before_first_request_evicts(self):
+        # The receivers are connected along with the view
+        OtherView.as_view(mode='list', cache_timeout=60)
+        other = MyOtherObjectModel.objects.create()
+        version = get_model_versions(cache, [MyOtherObjectModel])
+        other.save()
+        self.assertNotEqual(get_model_versions(cache, [MyOtherObjectModel]),
+            version)
+
+    def test_delete_evicts(self):
+        other = MyObjectModel.objects.create(slug='second')
+        self.get(mode='list')
+        other.delete()
+        with self.assertNumQueries(1):
+            self.get(mode='list')
+
+    def test_key_varies(self):
+        other = MyObjectModel.objects.create(slug='second')
+        self.get()
+        with self.assertNumQueries(1):
+            self.get(pk=other.id)
+        self.get(mode='list')
+        with self.assertNumQueries(1):
+            self.get(mode='list', data={'page': 2})
+
+    def test_key_varies_on_user(self):
+        user = User.objects.create(username='user')
+        view = CachedView.as_view(mode='detail')
+        for request_user in (AnonymousUser(), user):
+            request = self.rf.get('/')
+            request.user = request_user
+            with self.assertNumQueries(1):
+                self.assertEqual(view(request, pk=self.obj.id).status_code,
+                    200)
+            with self.assertNumQueries(0):
+                view(request, pk=self.obj.id)
+
+    def test_evicted_version(self):
+        # Versions restarting from the beginning once evicted would reuse
+        # the key of the first response
+        cache.clear()
+        self.get()
+        self.obj.save()
+        cache.delete(get_version_key(MyObjectModel))
+        with self.assertNumQueries(1):
+            self.get()
+
+    def test_membership_change_evicts(self):
+        user = User.objects.create(username='user')
+        group = Group.objects.create(name='group')
+        user.groups.add(group)
+        view = GroupView.as_view(mode='detail')
+        request = self.rf.get('/')
+        request.user = user
+        self.assertEqual(view(request, pk=group.id).status_code, 200)
+        user.groups.remove(group)
+        self.assertRaises(PermissionDenied, view, request, pk=group.id)
+
+    def test_csrf_cookie_is_not_cached(self):
+        view = FormView.as_view(mode='detail')
+        for i in range(2):
+            request = self.rf.get('/')
+            # What the CSRF middleware does
+            request.META['CSRF_COOKIE'] = 'token'
+            with self.assertNumQueries(1):
+                response = view(request, pk=self.obj.id)
+            self.assertTrue(request.META.get('CSRF_COOKIE_USED'))
+            self.assertTrue('token' in response.content)
+
+    def test_post_is_not_cached(self):
+        view = CachedView.as_view(mode='detail')
+        view(self.rf.get('/'), pk=self.obj.id)
+        with self.assertNumQueries(1):
+            view(self.rf.post('/'), pk=self.obj.id)
+
+    def test_errors_are_not_cached(self):
+        self.assertRaises(Http404, self.get, pk=self.obj.id + 1)
+        with self.assertNumQueries(1):
+            self.assertRaises(Http404, self.get, pk=self.obj.id + 1)
+
+
+class TestCachedResponse(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.built = []
+
+    def build(self):
+        self.built.append(1)
+        return HttpResponse('built')
+
+    def test_stale_entry_served_during_rebuild(self):
+        response = self.build()
+        entry = list(freeze_response(response, 60))
+        entry[0] = time.time() - 1
+        cache.set('key', tuple(entry))
+        cache.add('key:lock', 1)
+        response = cached_response(cache, 'key', 60, self.build,
+            stale_timeout=60)
+        self.assertEqual(response.content, 'built')
+        self.assertEqual(len(self.built), 1)
+
+    def test_builds_when_lock_expires(self):
+        cache.add('key:lock', 1)
+        response = cached_response(cache, 'key', 60, self.build,
+            lock_timeout=0.1, wait=0.01)
+        self.assertEqual(response.content, 'built')
+        self.assertEqual(len(self.built), 1)
+        self.assertTrue(cache.get('key'))
+
+
+class CachedObjectMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/obj_detail.html'
+    object_cache_timeout = 60
+
+
+class RestrictedObjectMixin(CachedObjectMixin):
+    def get_queryset(self):
+        return MyObjectModel.objects.exclude(slug='hidden')
+
+
+class CachedObjectView(View):
+    obj = CachedObjectMixin()
+
+
+class AnnotatedObjectMixin(CachedObjectMixin):
+    def get_queryset(self):
+        return MyObjectModel.objects.annotate(Count('children'))
+
+
+class AnnotatedObjectView(View):
+    obj = AnnotatedObjectMixin()
+
+
+class CachedOtherMixin(OtherMixin):
+    object_cache_timeout = 60
+
+
+class CachedOtherView(View):
+    other = CachedOtherMixin()
+
+
+class RestrictedObjectView(View):
+    obj = RestrictedObjectMixin()
+
+
+class TestObjectCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.obj = MyObjectModel.objects.create(slug='first')
+        self.rf = RequestFactory()
+
+    def get(self, view_class=CachedObjectView, **kwargs):
+        view = view_class.as_view(mode='detail')
+        return view(self.rf.get('/'), **kwargs)
+
+    def test_cached_by_pk(self):
+        self.get(pk=self.obj.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(pk=self.obj.id).status_code, 200)
+
+    def test_cached_by_slug(self):
+        self.get(slug='first')
+        with self.assertNumQueries(0):
+            self.get(slug='first')
+
+    def test_watched_along_with_the_view(self):
+        self.assertFalse(is_watching_objects(MyOtherObjectModel, 'default'))
+        CachedOtherView.as_view(mode='detail')
+        self.assertTrue(is_watching_objects(MyOtherObjectModel, 'default'))
+
+    def test_keyed_on_queryset_shape(self):
+        self.get(pk=self.obj.id)
+        with self.assertNumQueries(1):
+            response = self.get(AnnotatedObjectView, pk=self.obj.id)
+        self.assertEqual(response.context_data['obj'].children__count, 0)
+        with self.assertNumQueries(0):
+            response = self.get(pk=self.obj.id)
+        self.assertFalse(hasattr(response.context_data['obj'],
+            'children__count'))
+        self.obj.save()
+        with self.assertNumQueries(1):
+            self.get(AnnotatedObjectView, pk=self.obj.id)
+
+    def test_save_evicts(self):
+        self.get(pk=self.obj.id)
+        self.obj.save()
+        with self.assertNumQueries(1):
+            self.get(pk=self.obj.id)
+
+    def test_slug_change(self):
+        self.get(slug='first')
+        self.obj.slug = 'second'
+        self.obj.save()
+        self.get(pk=self.obj.id)
+        self.assertRaises(Http404, self.get, slug='first')
+
+    def test_delete_evicts(self):
+        self.get(pk=self.obj.id)
+        pk = self.obj.id
+        self.obj.delete()
+        self.assertRaises(Http404, self.get, pk=pk)
+
+    def test_queryset_is_enforced(self):
+        self.get(RestrictedObjectView, pk=self.obj.id)
+        with self.assertNumQueries(1):
+            self.get(RestrictedObjectView, pk=self.obj.id)
+        # Changes made without signals
+        MyObjectModel.objects.update(slug='hidden')
+        self.assertRaises(Http404, self.get, RestrictedObjectView,
+            pk=self.obj.id)
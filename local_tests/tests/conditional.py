@@ -0,0 +1,98 @@
+"""
+Tests the conditional GET support.
+"""
+
+import calendar
+import datetime
+
+from django.test import RequestFactory
+from django.test import TestCase
+from django.utils.http import http_date
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyChildObjectModel
+
+
+class ParentMixin(ObjectMixin):
+    model = MyObjectModel
+    pk_url_kwarg = 'parent_id'
+    validator_field = 'slug'
+
+
+class ChildMixin(ObjectMixin):
+    model = MyChildObjectModel
+    template_name = 'local_tests/obj_detail.html'
+    validator_field = 'updated_at'
+
+
+class ChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    child = ChildMixin()
+
+
+class TestConditionalGet(TestCase):
+
+    def setUp(self):
+        self.parent = MyObjectModel.objects.create(slug='parent')
+        self.child = MyChildObjectModel.objects.create(parent=self.parent)
+        self.rf = RequestFactory()
+
+    def get(self, mode='detail', **headers):
+        view = ChildView.as_view(mode=mode)
+        kwargs = {'parent_id': self.parent.id}
+        if mode == 'detail':
+            kwargs['pk'] = self.child.id
+        return view(self.rf.get('/', **headers), **kwargs)
+
+    def test_validators_are_set(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        updated_at = MyChildObjectModel.objects.get().updated_at
+        self.assertEqual(response['Last-Modified'],
+            http_date(calendar.timegm(updated_at.utctimetuple())))
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.parent.slug = 'renamed'
+        self.parent.save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.get()['Last-Modified']
+        response = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.child.updated_at = datetime.datetime.now() + \
+            datetime.timedelta(seconds=10)
+        MyChildObjectModel.objects.update(updated_at=self.child.updated_at)
+        response = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_validator_is_one_aggregate(self):
+        etag = self.get(mode='list')['ETag']
+        # The parent object and the aggregate
+        with self.assertNumQueries(2):
+            response = self.get(mode='list', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        MyChildObjectModel.objects.create(parent=self.parent)
+        response = self.get(mode='list', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_validator(self):
+        class Unvalidated(ChildMixin):
+            validator_field = None
+
+        class UnvalidatedView(View):
+            parent = ParentMixin(default_mode='detail')
+            child = Unvalidated()
+        view = UnvalidatedView.as_view(mode='detail')
+        response = view(self.rf.get('/'), parent_id=self.parent.id,
+            pk=self.child.id)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,142 @@
+"""
+Tests the delete and bulk_delete modes.
+"""
+
+from django.db.models.deletion import Collector
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import TestCase
+
+from mock import patch
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyChildObjectModel
+
+
+class ObjMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name_prefix = 'local_tests/obj'
+    success_url = '/done/'
+
+    def get_queryset(self):
+        return MyObjectModel.objects.exclude(slug='kept')
+
+
+class ObjView(View):
+    obj = ObjMixin()
+
+
+class BackgroundMixin(ObjMixin):
+    delete_background_threshold = 2
+
+
+class BackgroundView(View):
+    obj = BackgroundMixin()
+
+
+class TestDeleteModes(TestCase):
+
+    def setUp(self):
+        self.objs = [MyObjectModel.objects.create(slug='obj%i' % i)
+            for i in range(3)]
+        self.kept = MyObjectModel.objects.create(slug='kept')
+        for i in range(2):
+            MyChildObjectModel.objects.create(parent=self.objs[0])
+        self.rf = RequestFactory()
+
+    def test_get_confirmation(self):
+        view = ObjView.as_view(mode='delete')
+        response = view(self.rf.get('/'), pk=self.objs[0].id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['obj'], self.objs[0])
+        self.assertEqual(MyObjectModel.objects.count(), 4)
+
+    def test_delete(self):
+        view = ObjView.as_view(mode='delete')
+        response = view(self.rf.post('/'), pk=self.objs[0].id)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/done/')
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.mychildobjectmodel=2, local_tests.myobjectmodel=1')
+        self.assertFalse(response.has_header('X-Delete-Queued'))
+        self.assertFalse(
+            MyObjectModel.objects.filter(pk=self.objs[0].id).exists())
+        self.assertEqual(MyChildObjectModel.objects.count(), 0)
+
+    def test_delete_method(self):
+        view = ObjView.as_view(mode='delete')
+        response = view(self.rf.delete('/'), pk=self.objs[1].id)
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.myobjectmodel=1')
+        self.assertEqual(MyObjectModel.objects.count(), 3)
+
+    def test_delete_out_of_queryset(self):
+        view = ObjView.as_view(mode='delete')
+        self.assertRaises(Http404, view, self.rf.post('/'), pk=self.kept.id)
+        self.assertTrue(MyObjectModel.objects.filter(pk=self.kept.id).exists())
+
+    def test_bulk_delete(self):
+        view = ObjView.as_view(mode='bulk_delete')
+        ids = [self.objs[0].id, self.objs[2].id, self.kept.id]
+        response = view(self.rf.post('/', {'ids': ids}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.mychildobjectmodel=2, local_tests.myobjectmodel=2')
+        self.assertEqual(list(MyObjectModel.objects.all()),
+            [self.objs[1], self.kept])
+
+    def test_bulk_delete_method(self):
+        view = ObjView.as_view(mode='bulk_delete')
+        request = self.rf.delete('/?ids=%i&ids=%i' % (
+            self.objs[1].id, self.objs[2].id))
+        response = view(request)
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.myobjectmodel=2')
+        self.assertEqual(list(MyObjectModel.objects.all()),
+            [self.objs[0], self.kept])
+
+    def test_bulk_delete_confirmation(self):
+        view = ObjView.as_view(mode='bulk_delete')
+        ids = [self.objs[0].id, self.objs[2].id]
+        response = view(self.rf.get('/', {'ids': ids}))
+        self.assertEqual(list(response.context_data['obj_list']),
+            [self.objs[0], self.objs[2]])
+
+    def test_bulk_delete_invalid_ids(self):
+        view = ObjView.as_view(mode='bulk_delete')
+        self.assertRaises(Http404, view, self.rf.post('/', {'ids': 'x'}))
+        self.assertRaises(Http404, view, self.rf.post('/'))
+        self.assertEqual(MyObjectModel.objects.count(), 4)
+
+    def test_background_deletion(self):
+        view = BackgroundView.as_view(mode='bulk_delete')
+        ids = [obj.id for obj in self.objs]
+        with patch('alternative_views.worker.submit') as submit:
+            with patch.object(Collector, 'collect') as collect:
+                response = view(self.rf.post('/', {'ids': ids}))
+            # The cascade is counted, not fetched
+            self.assertEqual(collect.call_count, 0)
+            self.assertEqual(submit.call_count, 1)
+        self.assertEqual(response['X-Delete-Queued'], 'true')
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.mychildobjectmodel=2, local_tests.myobjectmodel=3')
+        self.assertEqual(MyObjectModel.objects.count(), 4)
+        # Changes made before the worker runs the deletion
+        MyChildObjectModel.objects.create(parent=self.objs[1])
+        # What the worker would run
+        func, args = submit.call_args[0][0], submit.call_args[0][1:]
+        func(*args)
+        self.assertEqual(list(MyObjectModel.objects.all()), [self.kept])
+        self.assertEqual(MyChildObjectModel.objects.count(), 0)
+
+    def test_below_background_threshold(self):
+        view = BackgroundView.as_view(mode='delete')
+        with patch('alternative_views.worker.submit') as submit:
+            response = view(self.rf.post('/'), pk=self.objs[1].id)
+            self.assertEqual(submit.call_count, 0)
+        self.assertEqual(response['X-Deleted-Objects'],
+            'local_tests.myobjectmodel=1')
+        self.assertEqual(MyObjectModel.objects.count(), 3)
+        self.assertRaises(Http404, view, self.rf.post('/'), pk=self.kept.id)
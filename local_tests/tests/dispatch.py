@@ -0,0 +1,162 @@
+"""
+Tests the dispatch doesn't build unneeded contexts.
+"""
+
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyOtherObjectModel
+
+
+class MyObjectMixin(ObjectMixin):
+    model = MyObjectModel
+
+
+class ParentMixin(MyObjectMixin):
+    pk_url_kwarg = 'parent'
+
+
+class ReadOnlyObjectMixin(MyObjectMixin):
+    http_method_names = ['get', 'head']
+
+
+class MyOtherObjectMixin(ObjectMixin):
+    model = MyOtherObjectModel
+    paginate_by = 10
+
+
+class ReadOnlyOtherObjectMixin(MyOtherObjectMixin):
+    http_method_names = ['get', 'head']
+
+
+class FormView(View):
+    parent = ParentMixin(default_mode='detail')
+    other = MyOtherObjectMixin(mode='list')
+    obj = MyObjectMixin()
+
+
+class RequiringMixin(MyObjectMixin):
+    requires = ('other',)
+
+
+class RequiringFormView(View):
+    parent = ParentMixin(default_mode='detail')
+    other = MyOtherObjectMixin(mode='list')
+    obj = RequiringMixin()
+
+
+class ReadOnlyView(View):
+    other = ReadOnlyOtherObjectMixin(mode='list')
+    obj = ReadOnlyObjectMixin()
+
+
+class TestHandlerFirst(TestCase):
+
+    fixtures = ['basic_mixins_test.json']
+    urls = 'local_tests.tests.object_urls'
+
+    def setUp(self):
+        self.rf = RequestFactory()
+
+    def test_method_not_allowed_builds_no_context(self):
+        view = ReadOnlyView.as_view(mode='detail')
+        with self.assertNumQueries(0):
+            response = view(self.rf.post('/'), pk=1)
+        self.assertEqual(response.status_code, 405)
+
+    def test_options(self):
+        view = ReadOnlyView.as_view(mode='detail')
+        with self.assertNumQueries(0):
+            response = view(self.rf.options('/'), pk=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Allow'], 'GET, HEAD')
+
+    def test_required_mixins(self):
+        view = FormView(mode='new')
+        handler = view.mixins['obj']
+        self.assertEqual(
+            handler.get_required_mixins(self.rf.post('/'), view.plan.mixins),
+            ['parent'])
+        self.assertEqual(
+            handler.get_required_mixins(self.rf.get('/'), view.plan.mixins),
+            None)
+
+    def test_declared_required_mixins(self):
+        view = RequiringFormView(mode='new')
+        handler = view.mixins['obj']
+        self.assertEqual(
+            handler.get_required_mixins(self.rf.post('/'), view.plan.mixins),
+            ['other'])
+
+    def test_valid_form_skips_the_other_mixins(self):
+        view = FormView.as_view(mode='new')
+        # The parent object and the insert, no count for other
+        with self.assertNumQueries(2):
+            response = view(self.rf.post('/', {'slug': 'new'}), parent=1)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(MyObjectModel.objects.filter(slug='new').exists())
+
+    def test_invalid_form_builds_the_full_context(self):
+        view = FormView.as_view(mode='new')
+        response = view(self.rf.post('/', {}), parent=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue('other_paginator' in response.context_data)
+        self.assertTrue(response.context_data['obj_form'].errors)
+
+
+class ReaderMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/obj_detail.html'
+
+    def get_queryset(self):
+        # Reads the previous mixin's object
+        return MyObjectModel.objects.filter(pk=self.parent.pk)
+
+
+class ReaderView(View):
+    parent = ParentMixin(default_mode='detail')
+    obj = ReaderMixin()
+
+
+class TestContextNamespace(TestCase):
+
+    def setUp(self):
+        self.obj = MyObjectModel.objects.create(slug='obj')
+        self.rf = RequestFactory()
+
+    def test_mixins_read_the_context(self):
+        view = ReaderView(mode='detail')
+        response = view.dispatch(self.rf.get('/'), parent=self.obj.pk,
+            pk=self.obj.pk)
+        self.assertEqual(response.status_code, 200)
+        mixin = view.mixins['obj']
+        self.assertEqual(mixin.parent, self.obj)
+        # Nothing was copied to the mixin
+        self.assertFalse('parent' in mixin.__dict__)
+
+    def test_unknown_names(self):
+        view = ReaderView(mode='detail')
+        mixin = view.mixins['obj']
+        self.assertFalse(hasattr(mixin, 'parent'))
+        self.assertRaises(AttributeError, getattr, mixin, '__deepcopy__')
+        view.context['__deepcopy__'] = None
+        self.assertRaises(AttributeError, getattr, mixin, '__deepcopy__')
+
+    def test_only_required_names(self):
+        view = ReaderView(mode='detail')
+        view.context.update({'parent': self.obj, 'obj': self.obj,
+            'object': self.obj})
+        # Names of other mixins' entries or of the following mixins
+        self.assertFalse(hasattr(view.mixins['obj'], 'object'))
+        self.assertFalse(hasattr(view.mixins['parent'], 'obj'))
+        self.assertEqual(view.mixins['obj'].parent, self.obj)
+        view.mixins['obj'].requires = ()
+        self.assertFalse(hasattr(view.mixins['obj'], 'parent'))
+
+    def test_attributes_take_precedence(self):
+        view = ReaderView(mode='detail')
+        view.context['model'] = None
+        self.assertEqual(view.mixins['obj'].model, MyObjectModel)
@@ -0,0 +1,71 @@
+"""
+Tests the views instrumentation.
+"""
+
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+from alternative_views.signals import view_instrumented
+
+from ..models import MyObjectModel, MyOtherObjectModel
+
+
+class MyObjectMixin(ObjectMixin):
+    model = MyObjectModel
+
+
+class MyOtherObjectMixin(ObjectMixin):
+    model = MyOtherObjectModel
+
+
+class InstrumentedView(View):
+    other = MyOtherObjectMixin(mode='list')
+    obj = MyObjectMixin()
+    instrument = True
+
+
+class TestInstrumentation(TestCase):
+
+    fixtures = ['basic_mixins_test.json']
+
+    def setUp(self):
+        self.received = []
+        view_instrumented.connect(self.receiver)
+
+    def tearDown(self):
+        view_instrumented.disconnect(self.receiver)
+
+    def receiver(self, sender, **kwargs):
+        self.received.append(kwargs)
+
+    def test_timings(self):
+        view = InstrumentedView.as_view(mode='detail')
+        request = RequestFactory().get('/')
+        response = view(request, pk=1)
+        self.assertEqual(len(self.received), 1)
+        data = self.received[0]
+        self.assertEqual(data['handler'], 'obj')
+        self.assertTrue(data['response'] is response)
+        self.assertEqual([(t.name, t.phase) for t in data['timings']], [
+            ('other', 'context'), ('obj', 'context'), ('obj', 'process'),
+            ('obj', 'render')])
+        # The list is fetched with its mixin's context
+        self.assertEqual([t.queries for t in data['timings']], [1, 1, 0, 0])
+        self.assertTrue(response.is_rendered)
+        self.assertTrue(all(t.duration >= 0 for t in data['timings']))
+        self.assertFalse('Server-Timing' in response)
+
+    def test_server_timing_header(self):
+        view = InstrumentedView.as_view(mode='detail', server_timing=True)
+        response = view(RequestFactory().get('/'), pk=1)
+        metrics = [metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics,
+            ['other.context', 'obj.context', 'obj.process', 'obj.render'])
+
+    def test_disabled_by_default(self):
+        view = InstrumentedView.as_view(mode='detail', instrument=False)
+        view(RequestFactory().get('/'), pk=1)
+        self.assertEqual(self.received, [])
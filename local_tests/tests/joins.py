@@ -0,0 +1,162 @@
+"""
+Tests the single query lookup of chained detail mixins.
+"""
+
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyOtherObjectModel, MyChildObjectModel
+
+
+class ParentMixin(ObjectMixin):
+    model = MyObjectModel
+    pk_url_kwarg = 'parent_id'
+    template_name = 'local_tests/obj_detail.html'
+
+    def get_queryset(self):
+        return MyObjectModel.objects.exclude(slug='hidden')
+
+
+class OtherMixin(ObjectMixin):
+    model = MyOtherObjectModel
+    pk_url_kwarg = 'other_id'
+    template_name = 'local_tests/obj_detail.html'
+
+
+class ChildMixin(ObjectMixin):
+    model = MyChildObjectModel
+    pk_url_kwarg = 'child_id'
+    template_name = 'local_tests/obj_detail.html'
+    join_lookups = ('parent',)
+
+    def get_queryset(self):
+        return MyChildObjectModel.objects.filter(parent=self.parent)
+
+
+class UndeclaredChildMixin(ChildMixin):
+    join_lookups = ()
+
+
+class SlugChildMixin(ChildMixin):
+
+    def get_queryset(self):
+        return MyChildObjectModel.objects.filter(
+            parent__slug=self.parent.slug)
+
+
+class ChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    child = ChildMixin()
+
+
+class UnjoinedChildView(ChildView):
+    join_parent_lookups = False
+
+
+class TwoParentsChildMixin(ChildMixin):
+    join_lookups = ('parent', 'other')
+
+    def get_queryset(self):
+        return MyChildObjectModel.objects.filter(parent=self.parent,
+            other=self.other)
+
+
+class TwoParentsChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    other = OtherMixin(default_mode='detail')
+    child = TwoParentsChildMixin()
+
+
+class UndeclaredChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    child = UndeclaredChildMixin()
+
+
+class SlugChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    child = SlugChildMixin()
+
+
+class ListChildView(View):
+    parent = ParentMixin(default_mode='detail')
+    others = OtherMixin(mode='list')
+    child = ChildMixin()
+
+
+class TestLookupChain(TestCase):
+
+    def setUp(self):
+        self.parent = MyObjectModel.objects.create(slug='parent')
+        self.hidden = MyObjectModel.objects.create(slug='hidden')
+        self.child = MyChildObjectModel.objects.create(parent=self.parent)
+        self.hidden_child = MyChildObjectModel.objects.create(
+            parent=self.hidden)
+        self.rf = RequestFactory()
+
+    def test_chain_detection(self):
+        self.assertEqual(ChildView.get_plan('detail').lookup_chain,
+            ('child', (('parent', 'parent'),)))
+        self.assertEqual(ListChildView.get_plan('detail').lookup_chain,
+            ('child', (('parent', 'parent'),)))
+        self.assertEqual(ChildView.get_plan('list').lookup_chain, None)
+        self.assertEqual(UnjoinedChildView.get_plan('detail').lookup_chain,
+            None)
+        self.assertEqual(ChildView.get_plan('detail', False).lookup_chain,
+            None)
+        self.assertEqual(UndeclaredChildView.get_plan('detail').lookup_chain,
+            None)
+
+    def test_objects_are_fetched_with_one_query(self):
+        view = ChildView.as_view(mode='detail')
+        request = self.rf.get('/')
+        with self.assertNumQueries(1):
+            response = view(request, parent_id=self.parent.id,
+                child_id=self.child.id)
+        self.assertEqual(response.context_data['parent'], self.parent)
+        self.assertEqual(response.context_data['child'], self.child)
+
+    def test_opt_out(self):
+        view = UnjoinedChildView.as_view(mode='detail')
+        request = self.rf.get('/')
+        with self.assertNumQueries(2):
+            response = view(request, parent_id=self.parent.id,
+                child_id=self.child.id)
+        self.assertEqual(response.context_data['child'], self.child)
+
+    def test_as_view_opt_out(self):
+        view = ChildView.as_view(mode='detail', join_parent_lookups=False)
+        with self.assertNumQueries(2):
+            view(self.rf.get('/'), parent_id=self.parent.id,
+                child_id=self.child.id)
+
+    def test_placeholder_fields(self):
+        # The placeholder loads the fields the queryset reads
+        view = SlugChildView.as_view(mode='detail')
+        response = view(self.rf.get('/'), parent_id=self.parent.id,
+            child_id=self.child.id)
+        self.assertEqual(response.context_data['child'], self.child)
+        self.assertEqual(response.context_data['parent'].slug, 'parent')
+
+    def test_parent_looked_up_by_slug(self):
+        other = MyOtherObjectModel.objects.create()
+        child = MyChildObjectModel.objects.create(parent=self.parent,
+            other=other)
+        self.assertEqual(TwoParentsChildView.get_plan('detail').lookup_chain,
+            ('child', (('parent', 'parent'), ('other', 'other'))))
+        view = TwoParentsChildView.as_view(mode='detail')
+        with self.assertNumQueries(3):
+            response = view(self.rf.get('/'), slug='parent',
+                other_id=other.id, child_id=child.id)
+        self.assertEqual(response.context_data['child'], child)
+
+    def test_querysets_are_enforced(self):
+        view = ChildView.as_view(mode='detail')
+        request = self.rf.get('/')
+        self.assertRaises(Http404, view, request, parent_id=self.hidden.id,
+            child_id=self.hidden_child.id)
+        self.assertRaises(Http404, view, request, parent_id=self.parent.id,
+            child_id=self.hidden_child.id)
@@ -0,0 +1,76 @@
+"""
+Tests the lazy mixins.
+"""
+
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel, MyOtherObjectModel
+
+
+class MyObjectMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/lazy_detail.html'
+
+
+class MyOtherObjectMixin(ObjectMixin):
+    model = MyOtherObjectModel
+    paginate_by = 10
+
+
+class AuthorizedObjectMixin(MyOtherObjectMixin):
+    def authorization(self, request, context):
+        return True
+
+
+class LazyView(View):
+    other = MyOtherObjectMixin(mode='list', lazy=True)
+    obj = MyObjectMixin()
+
+
+class TestLazyMixins(TestCase):
+
+    fixtures = ['basic_mixins_test.json']
+
+    def test_lazy_context_is_not_evaluated(self):
+        view = LazyView.as_view(mode='detail')
+        with self.assertNumQueries(1):
+            response = view(RequestFactory().get('/'), pk=1)
+        self.assertEqual(response.context_data['obj'].id, 1)
+        with self.assertNumQueries(2):
+            self.assertEqual(response.context_data['other_paginator'].count,
+                2)
+            self.assertEqual(len(response.context_data['other_list']), 2)
+
+    def test_lazy_context_is_evaluated_by_the_template(self):
+        view = LazyView.as_view(mode='detail')
+        response = view(RequestFactory().get('/'), pk=1)
+        response.render()
+        self.assertEqual(response.content, 'test:3,4,\n')
+
+    def test_handler_is_evaluated(self):
+        plan = LazyView.get_plan('list')
+        self.assertEqual(plan.mixins[1].lazy_names, None)
+
+        class LazyHandlerView(View):
+            obj = MyOtherObjectMixin(lazy=True)
+        plan = LazyHandlerView.get_plan('list')
+        self.assertTrue(plan.lazy)
+        view = LazyHandlerView(mode='list')
+        view.dispatch(RequestFactory().get('/'))
+        self.assertEqual(dict.__getitem__(view.context, 'obj_paginator').count,
+            2)
+
+    def test_authorizations_are_not_lazy(self):
+        class AuthorizedView(View):
+            other = AuthorizedObjectMixin(mode='list', lazy=True)
+            obj = MyObjectMixin()
+        plan = AuthorizedView.get_plan('detail')
+        self.assertEqual(plan.mixins[0].lazy_names, None)
+        self.assertFalse(plan.lazy)
+        self.assertEqual(LazyView.get_plan('detail').mixins[0].lazy_names, (
+            'other_list', 'other_paginator', 'other_page_obj',
+            'other_is_paginated'))
@@ -2,6 +2,7 @@
 
 """
 
+from django.core.exceptions import ImproperlyConfigured
 from django.test import RequestFactory
 
 from django.test import TestCase
@@ -9,7 +10,7 @@ from django.test import TestCase
 from alternative_views.base import View
 from alternative_views.mixins.object import ObjectMixin
 
-from ..models import MyObjectModel, MyOtherObjectModel
+from ..models import MyObjectModel, MyOtherObjectModel, MyChildObjectModel
 
 
 class MyObjectMixin(ObjectMixin):
@@ -55,6 +56,153 @@ class TestObjectMixin(TestCase):
         self.assertTrue(isinstance(mixin, MyObjectMixin))
         self.assertTrue(isinstance(mixin, MultipleObjectMixin))
 
+    def test_as_mode_reuses_the_specialised_class(self):
+        mixin1 = MyObjectMixin()
+        mixin1.as_mode('detail')
+        mixin2 = MyObjectMixin()
+        mixin2.as_mode('detail')
+        self.assertTrue(mixin1.__class__ is mixin2.__class__)
+        self.assertEqual(mixin1.__class__.__name__, 'DetailMyObjectMixin')
+
+    def test_mode_classes_registry(self):
+        from alternative_views.mixins.object import (prepare_mode_classes,
+            registered_mode_classes, clear_mode_classes)
+        clear_mode_classes()
+        self.assertEqual(registered_mode_classes(), {})
+        classes = prepare_mode_classes(MyObjectMixin, ['list', 'detail'])
+        self.assertEqual(sorted(classes.keys()), ['detail', 'list'])
+        self.assertEqual(registered_mode_classes(), {
+            (MyObjectMixin, 'list'): classes['list'],
+            (MyObjectMixin, 'detail'): classes['detail'],
+        })
+        mixin = MyObjectMixin()
+        mixin.as_mode('list')
+        self.assertTrue(mixin.__class__ is classes['list'])
+        clear_mode_classes()
+        self.assertEqual(registered_mode_classes(), {})
+
+    def test_unknown_mode(self):
+        mixin = MyObjectMixin()
+        with self.assertRaises(NotImplementedError):
+            mixin.as_mode('unknown')
+
+
+class TestFormClasses(TestCase):
+
+    def setUp(self):
+        from alternative_views.mixins.object.edit import clear_form_classes
+        clear_form_classes()
+
+    def get_form_class(self, **attrs):
+        mixin = MyObjectMixin()
+        mixin.as_mode('new')
+        for key, value in attrs.items():
+            setattr(mixin, key, value)
+        return mixin.get_form_class()
+
+    def test_form_class_is_reused(self):
+        form_class = self.get_form_class()
+        self.assertTrue(self.get_form_class() is form_class)
+        self.assertEqual(form_class._meta.model, MyObjectModel)
+        self.assertEqual(form_class.base_fields.keys(), ['slug'])
+
+    def test_options_build_different_classes(self):
+        default = self.get_form_class()
+        excluded = self.get_form_class(exclude=['slug'])
+        self.assertFalse(default is excluded)
+        self.assertEqual(excluded.base_fields.keys(), [])
+        self.assertTrue(self.get_form_class(exclude=('slug',)) is excluded)
+
+    def test_empty_options(self):
+        default = self.get_form_class()
+        no_fields = self.get_form_class(fields=())
+        self.assertFalse(no_fields is default)
+        self.assertEqual(no_fields.base_fields.keys(), [])
+        self.assertFalse(self.get_form_class(exclude=()) is no_fields)
+
+    def test_widgets(self):
+        from django import forms
+        widgets = {'slug': forms.Textarea}
+        form_class = self.get_form_class(widgets=widgets)
+        self.assertTrue(isinstance(form_class.base_fields['slug'].widget,
+            forms.Textarea))
+        self.assertTrue(self.get_form_class(widgets=widgets) is form_class)
+
+    def test_clear(self):
+        from alternative_views.mixins.object.edit import (clear_form_classes,
+            FORM_CLASSES)
+        form_class = self.get_form_class()
+        self.assertEqual(FORM_CLASSES.values(), [form_class])
+        clear_form_classes()
+        self.assertEqual(FORM_CLASSES, {})
+        self.assertFalse(self.get_form_class() is form_class)
+
+
+class TestTemplateCache(TestCase):
+
+    def setUp(self):
+        from alternative_views.mixins import clear_templates
+        clear_templates()
+
+    def get_mixin(self, mode='list'):
+        mixin = MyObjectMixin()
+        mixin.context_object_name = 'obj'
+        mixin.as_mode(mode)
+        return mixin
+
+    def test_template_is_resolved_once(self):
+        import mock
+        from alternative_views import mixins
+        template = self.get_mixin().get_template()
+        self.assertEqual(template.name, 'local_tests/obj_list.html')
+        with mock.patch.object(mixins, 'select_template') as select_template:
+            self.assertTrue(self.get_mixin().get_template() is template)
+            self.assertFalse(select_template.called)
+        self.assertFalse(self.get_mixin('detail').get_template() is template)
+
+    def test_missing_template_is_not_cached(self):
+        from alternative_views.mixins import TEMPLATES
+        mixin = self.get_mixin()
+        mixin.context_object_name = 'missing'
+        self.assertEqual(mixin.get_template(),
+            ['local_tests/missing_list.html'])
+        self.assertEqual(TEMPLATES, {})
+
+    def test_no_cache_in_debug_mode(self):
+        from django.test.utils import override_settings
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.get_mixin().get_template(),
+                ['local_tests/obj_list.html'])
+
+    def test_overridden_template_names_stay_dynamic(self):
+        class AjaxMixin(MyObjectMixin):
+            def get_template_names(self):
+                if self.request.is_ajax():
+                    return ['local_tests/obj_detail.html']
+                return super(AjaxMixin, self).get_template_names()
+        mixin = AjaxMixin()
+        mixin.context_object_name = 'obj'
+        mixin.as_mode('list')
+        mixin.request = RequestFactory().get('/')
+        self.assertEqual(mixin.get_template_cache_key(), None)
+        self.assertEqual(mixin.get_template(), ['local_tests/obj_list.html'])
+        mixin.request = RequestFactory().get('/',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(mixin.get_template(),
+            ['local_tests/obj_detail.html'])
+
+    def test_object_template_stays_dynamic(self):
+        mixin = self.get_mixin('detail')
+        mixin.template_name_field = 'slug'
+        mixin.object = MyObjectModel(slug='local_tests/obj_list.html')
+        self.assertEqual(mixin.get_template(), [
+            'local_tests/obj_list.html',
+            'local_tests/obj_detail.html',
+        ])
+        mixin.object = MyObjectModel(slug='')
+        self.assertEqual(mixin.get_template().name,
+            'local_tests/obj_detail.html')
+
 
 class TestObjectListMixin(TestCase):
 
@@ -208,3 +356,56 @@ class TestObjectMixinIntegrationWithView(TestCase):
         self.assertFormError(response, 'obj_form', 'slug', u'This field is required.')
         instance = MyObjectModel.objects.get(id=1)
         self.assertEqual(instance.slug, 'test')
+
+
+class ProjectedMixin(ObjectMixin):
+    model = MyChildObjectModel
+    template_name = 'local_tests/obj_detail.html'
+    only_fields = {'list': ('parent',)}
+    defer_fields = {'detail': ('updated_at',)}
+
+
+class ProjectedView(View):
+    child = ProjectedMixin()
+
+
+class TestProjections(TestCase):
+
+    def setUp(self):
+        parent = MyObjectModel.objects.create(slug='parent')
+        self.child = MyChildObjectModel.objects.create(parent=parent)
+        self.rf = RequestFactory()
+
+    def test_list(self):
+        response = ProjectedView.as_view(mode='list')(self.rf.get('/'))
+        queryset = response.context_data['child_list']
+        self.assertEqual(queryset.query.deferred_loading,
+            (set(['parent']), False))
+
+    def test_detail(self):
+        response = ProjectedView.as_view(mode='detail')(self.rf.get('/'),
+            pk=self.child.id)
+        obj = response.context_data['child']
+        self.assertTrue(obj._deferred)
+        with self.assertNumQueries(1):
+            obj.updated_at
+
+    def test_unknown_field(self):
+        self.assertRaises(ImproperlyConfigured, type(ObjectMixin),
+            'BadMixin', (ObjectMixin,), {'model': MyObjectModel,
+            'only_fields': {'list': ('title',)}})
+
+    def test_unknown_mode(self):
+        self.assertRaises(ImproperlyConfigured, type(ObjectMixin),
+            'BadMixin', (ObjectMixin,), {'model': MyObjectModel,
+            'defer_fields': {'lists': ('slug',)}})
+
+    def test_not_joined(self):
+        class ParentMixin(ObjectMixin):
+            model = MyObjectModel
+            pk_url_kwarg = 'parent_id'
+
+        class ChildView(View):
+            parent = ParentMixin(default_mode='detail')
+            child = ProjectedMixin()
+        self.assertEqual(ChildView.get_plan('detail').lookup_chain, None)
@@ -0,0 +1,130 @@
+"""
+Tests the list mixins pagination.
+"""
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.mixins.object import ObjectMixin
+
+from ..models import MyObjectModel
+
+
+class CursorMixin(ObjectMixin):
+    model = MyObjectModel
+    paginate_by = 2
+    cursor_field = 'id'
+
+
+class TestCursorPagination(TestCase):
+
+    def setUp(self):
+        self.objects = [MyObjectModel.objects.create(slug=str(i))
+            for i in range(5)]
+        self.rf = RequestFactory()
+
+    def get_context(self, mixin_class=CursorMixin, **params):
+        mixin = mixin_class(mode='list')
+        mixin.as_mode('list')
+        mixin.context_object_name = 'obj'
+        mixin.kwargs = {}
+        return mixin.get_context(self.rf.get('/', params), {})
+
+    def test_first_page(self):
+        with self.assertNumQueries(1):
+            context = self.get_context()
+        self.assertEqual(context['obj_list'], self.objects[:2])
+        self.assertTrue(context['obj_is_paginated'])
+        self.assertEqual(context['obj_paginator'], None)
+        self.assertEqual(context['obj_prev_cursor'], None)
+        self.assertTrue(context['obj_next_cursor'])
+
+    def test_walk_forward_and_backward(self):
+        context = self.get_context()
+        context = self.get_context(after=context['obj_next_cursor'])
+        self.assertEqual(context['obj_list'], self.objects[2:4])
+        context = self.get_context(after=context['obj_next_cursor'])
+        self.assertEqual(context['obj_list'], self.objects[4:])
+        self.assertEqual(context['obj_next_cursor'], None)
+        context = self.get_context(before=context['obj_prev_cursor'])
+        self.assertEqual(context['obj_list'], self.objects[2:4])
+        context = self.get_context(before=context['obj_prev_cursor'])
+        self.assertEqual(context['obj_list'], self.objects[:2])
+        self.assertEqual(context['obj_prev_cursor'], None)
+        self.assertTrue(context['obj_next_cursor'])
+
+    def test_descending_order(self):
+        class DescendingMixin(CursorMixin):
+            cursor_field = '-id'
+        context = self.get_context(DescendingMixin)
+        self.assertEqual(context['obj_list'], self.objects[:2:-1])
+        context = self.get_context(DescendingMixin,
+            after=context['obj_next_cursor'])
+        self.assertEqual(context['obj_list'], self.objects[2:0:-1])
+
+    def test_cursor_from_url_kwargs(self):
+        mixin = CursorMixin(mode='list')
+        mixin.as_mode('list')
+        mixin.context_object_name = 'obj'
+        mixin.kwargs = {'after': mixin.encode_cursor(self.objects[3].id)}
+        context = mixin.get_context(self.rf.get('/'), {})
+        self.assertEqual(context['obj_list'], self.objects[4:])
+
+    def test_invalid_cursor(self):
+        self.assertRaises(Http404, self.get_context, after='!')
+
+
+class CountMixin(ObjectMixin):
+    model = MyObjectModel
+    paginate_by = 2
+
+
+class TestCountStrategies(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            MyObjectModel.objects.create(slug=str(i))
+        self.rf = RequestFactory()
+
+    def get_context(self, **attrs):
+        mixin = CountMixin(mode='list')
+        mixin.as_mode('list')
+        mixin.context_object_name = 'obj'
+        mixin.kwargs = {}
+        for key, value in attrs.items():
+            setattr(mixin, key, value)
+        return mixin.get_context(self.rf.get('/'), {})
+
+    def test_exact_count(self):
+        context = self.get_context()
+        self.assertEqual(context['obj_paginator'].count, 5)
+        self.assertEqual(context['obj_paginator'].num_pages, 3)
+
+    def test_cached_count(self):
+        with self.assertNumQueries(1):
+            context = self.get_context(count_strategy='cached')
+            self.assertEqual(context['obj_paginator'].count, 5)
+        MyObjectModel.objects.create(slug='new')
+        with self.assertNumQueries(0):
+            context = self.get_context(count_strategy='cached')
+            self.assertEqual(context['obj_paginator'].count, 5)
+        cache.clear()
+        context = self.get_context(count_strategy='cached')
+        self.assertEqual(context['obj_paginator'].count, 6)
+
+    def test_estimated_count_falls_back_to_exact_on_sqlite(self):
+        context = self.get_context(count_strategy='estimated')
+        self.assertEqual(context['obj_paginator'].count, 5)
+
+    def test_callable_strategy(self):
+        context = self.get_context(count_strategy=lambda qs: 100)
+        self.assertEqual(context['obj_paginator'].count, 100)
+        self.assertEqual(context['obj_paginator'].num_pages, 50)
+
+    def test_unknown_strategy(self):
+        self.assertRaises(ImproperlyConfigured, self.get_context,
+            count_strategy='unknown')
@@ -0,0 +1,171 @@
+"""
+Tests the mixins dependencies and the concurrent context building.
+"""
+
+import threading
+import time
+
+import mock
+
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins import Mixin
+from alternative_views.mixins.object import ObjectMixin
+from alternative_views.plan import get_waves
+
+from ..models import MyObjectModel, MyOtherObjectModel, MyChildObjectModel
+
+
+class SlowMixin(Mixin):
+    requires = ()
+    delay = 0.1
+
+    def get_context(self, request, context, permissions=None, **kwargs):
+        time.sleep(self.delay)
+        context[self.context_object_name] = threading.current_thread().name
+        return context
+
+
+class ProjectMixin(SlowMixin):
+    delay = 0
+
+
+class ReaderMixin(SlowMixin):
+    requires = ('project',)
+    delay = 0
+
+    def get_context(self, request, context, permissions=None, **kwargs):
+        context[self.context_object_name] = self.project
+        return context
+
+
+class DeniedMixin(SlowMixin):
+    delay = 0
+
+    def get_context(self, request, context, permissions=None, **kwargs):
+        raise PermissionDenied()
+
+
+class SidebarView(View):
+    project = ProjectMixin()
+    first = SlowMixin()
+    second = SlowMixin()
+    third = SlowMixin()
+    reader = ReaderMixin()
+    parallel_workers = 3
+
+
+class DeniedView(View):
+    first = SlowMixin()
+    denied = DeniedMixin()
+    parallel_workers = 2
+
+
+class SequentialView(View):
+    first = Mixin()
+    second = Mixin()
+
+
+class ObjectListMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/obj_list.html'
+    requires = ()
+
+
+class OtherListMixin(ObjectListMixin):
+    model = MyOtherObjectModel
+
+
+class ChildListMixin(ObjectListMixin):
+    model = MyChildObjectModel
+    paginate_by = 1
+
+
+class ListsView(View):
+    objects = ObjectListMixin()
+    others = OtherListMixin()
+    children = ChildListMixin()
+    parallel_workers = 3
+
+
+class TestDependencies(TestCase):
+
+    def test_graph(self):
+        self.assertEqual(SidebarView.mixin_dependencies.items(), [
+            ('project', ()), ('first', ()), ('second', ()), ('third', ()),
+            ('reader', ('project',))])
+        self.assertEqual(SequentialView.mixin_dependencies.items(), [
+            ('first', ()), ('second', ('first',))])
+
+    def test_requires_a_later_mixin(self):
+        class EarlyMixin(Mixin):
+            requires = ('late',)
+        attrs = {'early': EarlyMixin(), 'late': Mixin()}
+        self.assertRaises(ImproperlyConfigured, type(View), 'BadView',
+            (View,), attrs)
+
+    def test_missing_names_are_ignored(self):
+        class OptionalView(View):
+            reader = ReaderMixin()
+        self.assertEqual(OptionalView.mixin_dependencies['reader'], ())
+
+    def test_waves(self):
+        specs = SidebarView.get_plan('detail').mixins
+        waves = get_waves(specs, SidebarView.mixin_dependencies)
+        self.assertEqual([[spec.name for spec in wave] for wave in waves],
+            [['project', 'first', 'second', 'third'], ['reader']])
+        specs = SequentialView.get_plan('detail').mixins
+        self.assertEqual(
+            len(get_waves(specs, SequentialView.mixin_dependencies)), 2)
+
+
+class TestParallelContext(TestCase):
+
+    def build(self, view_class):
+        view = view_class(mode='detail')
+        view.build_context(view.plan.mixins, RequestFactory().get('/'),
+            {}, {}, None)
+        return view.context
+
+    def test_independent_mixins_run_concurrently(self):
+        start = time.time()
+        context = self.build(SidebarView)
+        self.assertTrue(time.time() - start < 0.25)
+        threads = set([context['first'], context['second'], context['third']])
+        self.assertEqual(len(threads), 3)
+        self.assertFalse(threading.current_thread().name in threads)
+        self.assertEqual(context['reader'], context['project'])
+
+    def test_connections_are_released(self):
+        with mock.patch('alternative_views.parallel.release_connections') \
+                as release_connections:
+            self.build(SidebarView)
+        self.assertEqual(release_connections.call_count, 4)
+
+    def test_errors_are_raised(self):
+        self.assertRaises(PermissionDenied, self.build, DeniedView)
+
+    def test_sequential_without_workers(self):
+        view = SidebarView(mode='detail', parallel_workers=None)
+        view.build_context(view.plan.mixins, RequestFactory().get('/'),
+            {}, {}, None)
+        self.assertEqual(view.context['first'],
+            threading.current_thread().name)
+
+    def test_lists_are_fetched_by_the_workers(self):
+        parent = MyObjectModel.objects.create(slug='parent')
+        other = MyOtherObjectModel.objects.create()
+        children = [MyChildObjectModel.objects.create(parent=parent)
+            for i in range(2)]
+        response = ListsView.as_view(mode='list')(RequestFactory().get('/'))
+        with self.assertNumQueries(0):
+            response.render()
+        self.assertEqual(list(response.context_data['objects_list']),
+            [parent])
+        self.assertEqual(list(response.context_data['others_list']),
+            [other])
+        self.assertEqual(list(response.context_data['children_list']),
+            children[:1])
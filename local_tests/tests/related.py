@@ -0,0 +1,99 @@
+"""
+Tests the per mode select_related and prefetch_related options.
+"""
+
+import warnings
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+from alternative_views.mixins.object.related import RelatedLoadWarning
+
+from ..models import MyObjectModel, MyChildObjectModel
+
+
+class ChildMixin(ObjectMixin):
+    model = MyChildObjectModel
+    template_name = 'local_tests/child_list.html'
+
+
+class SelectedChildMixin(ChildMixin):
+    select_related = {'list': ('parent',)}
+
+    def get_queryset(self):
+        return MyChildObjectModel.objects.select_related('other')
+
+
+class ParentMixin(ObjectMixin):
+    model = MyObjectModel
+    template_name = 'local_tests/parent_list.html'
+    prefetch_related = {'list': ('children',)}
+
+
+class ChildView(View):
+    child = ChildMixin()
+
+
+class SelectedChildView(View):
+    child = SelectedChildMixin()
+
+
+class ParentView(View):
+    obj = ParentMixin()
+
+
+class TestRelatedOptions(TestCase):
+
+    def setUp(self):
+        self.rf = RequestFactory()
+        for i in range(3):
+            parent = MyObjectModel.objects.create(slug='p%i' % i)
+            MyChildObjectModel.objects.create(parent=parent)
+
+    def render(self, view_class):
+        response = view_class.as_view(mode='list')(self.rf.get('/'))
+        return response.render()
+
+    def test_select_related(self):
+        with self.assertNumQueries(1):
+            response = self.render(SelectedChildView)
+        self.assertEqual(response.content.strip(), 'p0 p1 p2')
+        queryset = response.context_data['child_list']
+        self.assertEqual(sorted(queryset.query.select_related.keys()),
+            ['other', 'parent'])
+
+    def test_without_select_related(self):
+        with self.assertNumQueries(4):
+            self.render(ChildView)
+
+    def test_prefetch_related(self):
+        with self.assertNumQueries(2):
+            self.render(ParentView)
+
+    @override_settings(DEBUG=True)
+    def test_warning(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.render(ChildView)
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, RelatedLoadWarning))
+        self.assertTrue('parent (3 times)' in unicode(caught[0].message))
+
+    @override_settings(DEBUG=True)
+    def test_no_warning(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.render(SelectedChildView)
+        self.assertEqual(caught, [])
+
+    def test_unknown_relation(self):
+        self.assertRaises(ImproperlyConfigured, type(ObjectMixin),
+            'BadMixin', (ObjectMixin,), {'model': MyChildObjectModel,
+            'select_related': {'list': ('updated_at',)}})
+        self.assertRaises(ImproperlyConfigured, type(ObjectMixin),
+            'BadMixin', (ObjectMixin,), {'model': MyObjectModel,
+            'prefetch_related': {'list': ('child',)}})
@@ -0,0 +1,124 @@
+"""
+Tests the streaming list mode.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist
+from django.test import RequestFactory
+from django.test import TestCase
+
+from alternative_views.base import View
+from alternative_views.mixins.object import ObjectMixin
+from alternative_views.mixins.object.stream import (get_stream_ordering,
+    iterate_by_chunks)
+
+from ..models import MyObjectModel
+
+
+class StreamMixin(ObjectMixin):
+    model = MyObjectModel
+    stream_chunk_size = 2
+
+
+class NoRowMixin(StreamMixin):
+    template_name_prefix = 'local_tests/missing'
+
+
+class StreamView(View):
+    obj = StreamMixin()
+
+
+class CachedStreamView(View):
+    obj = StreamMixin()
+    cache_timeout = 60
+
+
+class NoRowView(View):
+    missing = NoRowMixin()
+
+
+class ReversedMixin(StreamMixin):
+    def get_queryset(self):
+        return MyObjectModel.objects.order_by('-id')
+
+
+class ReversedView(View):
+    obj = ReversedMixin()
+
+
+class BySlugMixin(StreamMixin):
+    def get_queryset(self):
+        return MyObjectModel.objects.order_by('slug')
+
+
+class BySlugView(View):
+    obj = BySlugMixin()
+
+
+class TestStreamMode(TestCase):
+
+    def setUp(self):
+        self.objects = [MyObjectModel.objects.create(slug='obj%i' % i)
+            for i in range(5)]
+        self.rf = RequestFactory()
+
+    def test_rows_are_fetched_by_chunks(self):
+        with self.assertNumQueries(3):
+            objects = list(iterate_by_chunks(MyObjectModel.objects.all(), 2))
+        self.assertEqual(objects, self.objects)
+
+    def test_stream(self):
+        view = StreamView.as_view(mode='stream')
+        with self.assertNumQueries(0):
+            response = view(self.rf.get('/'))
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(3):
+            content = ''.join(response)
+        self.assertEqual(content,
+            '<ul data-paginated="False">\n' +
+            ''.join(['<li>obj%i</li>\n' % i for i in range(5)]) +
+            '</ul>\n')
+
+    def test_keeps_the_queryset_ordering(self):
+        view = ReversedView.as_view(mode='stream')
+        response = view(self.rf.get('/'))
+        with self.assertNumQueries(3):
+            content = ''.join(response)
+        self.assertEqual(content,
+            '<ul data-paginated="False">\n' +
+            ''.join(['<li>obj%i</li>\n' % i for i in range(4, -1, -1)]) +
+            '</ul>\n')
+
+    def test_unsupported_ordering(self):
+        view = BySlugView.as_view(mode='stream')
+        self.assertRaises(ImproperlyConfigured, view, self.rf.get('/'))
+
+    def test_ordering(self):
+        queryset = MyObjectModel.objects.all()
+        self.assertEqual(get_stream_ordering(queryset), 'id')
+        self.assertEqual(get_stream_ordering(queryset.order_by()), 'pk')
+        self.assertEqual(get_stream_ordering(queryset.order_by('-pk')),
+            '-pk')
+        self.assertEqual(get_stream_ordering(queryset.order_by('slug'),
+            'slug'), 'slug')
+        self.assertRaises(ImproperlyConfigured, get_stream_ordering,
+            queryset.order_by('slug', 'id'))
+        self.assertRaises(ImproperlyConfigured, get_stream_ordering,
+            queryset[:2])
+
+    def test_not_cached(self):
+        view = CachedStreamView.as_view(mode='stream')
+        ''.join(view(self.rf.get('/')))
+        with self.assertNumQueries(3):
+            ''.join(view(self.rf.get('/')))
+
+    def test_missing_row_template(self):
+        view = NoRowView.as_view(mode='stream')
+        self.assertRaises(TemplateDoesNotExist, view, self.rf.get('/'))
+
+    def test_context_names(self):
+        mixin = StreamMixin()
+        mixin.context_object_name = 'obj'
+        mixin.as_mode('stream')
+        self.assertEqual(mixin.get_context_names(), ['obj_list',
+            'obj_paginator', 'obj_page_obj', 'obj_is_paginated'])
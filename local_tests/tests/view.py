@@ -35,6 +35,28 @@ class ContentView(View):
     context2 = ContextMixin2()
 
 
+class NamedContextMixin(ContextMixin):
+    def get_context(self, request, context, **kwargs):
+        super(NamedContextMixin, self).get_context(request, context)
+        context[self.context_object_name] = 'Named data'
+        return context
+
+
+class NamedContentView(View):
+    mixin1 = MyMixin1()
+    context1 = NamedContextMixin()
+    context2 = ContextMixin2()
+
+
+class ReadOnlyMixin(ContextMixin2):
+    http_method_names = ['get']
+
+
+class ReadOnlyView(View):
+    mixin1 = MyMixin1(default_mode='detail')
+    context2 = ReadOnlyMixin()
+
+
 class TestViewResponse(TestCase):
 
     def test_context_updates(self):
@@ -62,12 +84,13 @@ class TestViewResponse(TestCase):
         self.assertEqual(response.context_data, expected_context)
 
     def test_mixins_have_others_context(self):
-        view = ContentView(mode='detail')
+        view = NamedContentView(mode='detail')
         rf = RequestFactory()
         request = rf.get('/')
         view.dispatch(request)
-        self.assertTrue(hasattr(view.mixins['context2'], 'updated_infos'))
-        self.assertEqual(view.mixins['context2'].updated_infos, True)
+        self.assertEqual(view.mixins['context2'].context1, 'Named data')
+        # Only the entries named after the previous mixins are read
+        self.assertFalse(hasattr(view.mixins['context2'], 'updated_infos'))
 
 
 class TestMixinMode(TestCase):
@@ -111,3 +134,64 @@ class TestMixinMode(TestCase):
             self.assertEqual(view.mixins['mixin1'].mode, default_mode)
             self.assertEqual(view.mixins['context1'].mode, default_mode)
             self.assertEqual(view.mixins['context2'].mode, mode)
+
+
+class TestDispatchPlan(TestCase):
+
+    def test_plan_is_compiled_once_per_mode(self):
+        plan = ReadOnlyView.get_plan('list')
+        self.assertTrue(ReadOnlyView.get_plan('list') is plan)
+        self.assertFalse(ReadOnlyView.get_plan('detail') is plan)
+        self.assertFalse(('list', True) in ContentView.dispatch_plans)
+
+    def test_as_view_compiles_the_plan(self):
+        class PlanView(View):
+            mixin1 = MyMixin1()
+        self.assertEqual(PlanView.dispatch_plans, {})
+        PlanView.as_view(mode='list')
+        self.assertEqual(PlanView.dispatch_plans.keys(), [('list', True)])
+        PlanView.as_view(mode='list', join_parent_lookups=False)
+        self.assertEqual(sorted(PlanView.dispatch_plans.keys()),
+            [('list', False), ('list', True)])
+
+    def test_plan_content(self):
+        plan = ReadOnlyView.get_plan('list')
+        self.assertEqual([spec.name for spec in plan.mixins],
+            ['mixin1', 'context2'])
+        self.assertEqual([spec.mode for spec in plan.mixins],
+            ['detail', 'list'])
+        self.assertEqual(plan.get_handler_name('get'), 'context2')
+        self.assertEqual(plan.get_handler_name('post'), 'mixin1')
+        self.assertEqual(plan.allowed_methods, tuple(View.http_method_names))
+        self.assertFalse(plan.dynamic)
+        self.assertRaises(AttributeError, setattr, plan, 'mode', 'detail')
+
+    def test_instances_do_not_share_the_plan_mixins(self):
+        view = ReadOnlyView(mode='list')
+        plan = ReadOnlyView.get_plan('list')
+        self.assertFalse(view.mixins['context2'] is plan.mixins[1].mixin)
+        self.assertEqual(view.mixins['context2'].mode, 'list')
+
+    def test_method_not_allowed(self):
+        class OnlyGetView(View):
+            context2 = ReadOnlyMixin()
+        view = OnlyGetView.as_view(mode='detail')
+        rf = RequestFactory()
+        response = view(rf.post('/'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'get')
+        self.assertEqual(view(rf.get('/')).status_code, 200)
+
+    def test_overridden_can_process_is_used(self):
+        class AjaxMixin(ContextMixin2):
+            def can_process(self, request):
+                return request.is_ajax()
+
+        class AjaxView(View):
+            context2 = AjaxMixin()
+        self.assertTrue(AjaxView.get_plan('detail').dynamic)
+        view = AjaxView.as_view(mode='detail')
+        rf = RequestFactory()
+        self.assertEqual(view(rf.get('/')).status_code, 405)
+        response = view(rf.get('/', HTTP_X_REQUESTED_WITH='XMLHttpRequest'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Runs the benchmarks and prints the results as JSON.
+
+    python runbenchmarks.py [--number=N] [--output=results.json]
+"""
+import sys
+import platform
+from optparse import OptionParser
+from os.path import dirname, abspath
+
+# Same settings as the test suite
+import runtests
+
+
+def runbenchmarks(number=100):
+    parent = dirname(abspath(__file__))
+    sys.path.insert(0, parent)
+
+    import django
+    from django.utils import simplejson
+    from alternative_views import VERSION
+    from benchmarks import construction, context, dispatch
+    from benchmarks.utils import setup_database
+
+    setup_database()
+    results = {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'construction': construction.run(number=number),
+        'context': context.run(number=number),
+        'dispatch': dispatch.run(number=number),
+    }
+    return simplejson.dumps(results, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    parser = OptionParser()
+    parser.add_option('--number', type='int', default=100,
+        help='calls per measure')
+    parser.add_option('--output', help='file to write the results to')
+    options, args = parser.parse_args()
+    output = runbenchmarks(number=options.number)
+    if options.output:
+        open(options.output, 'w').write(output)
+    else:
+        print output